@@ -0,0 +1,111 @@
+"""
+Measures the configuration mappers of `Neo4jGraphWidget` against the per-item dispatch that resolved the
+configuration of each item anew.
+
+Usage:
+    python benchmarks/mapper.py --sizes 10000 100000 --repeat 5
+
+For each size, the node bindings are mapped for that many items of several labels with constant, property, function
+and wildcard bindings. Both mappers must return the same values; the reported values are the medians of the
+repetitions.
+"""
+import argparse
+import inspect
+import random
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Union
+
+from yfiles_jupyter_graphs import GraphWidget
+from yfiles_jupyter_graphs_for_neo4j import Neo4jGraphWidget
+from yfiles_jupyter_graphs_for_neo4j.Yfiles_Neo4j_Graphs import POSSIBLE_NODE_BINDINGS
+
+CONFIGURATIONS = {
+    'Person': {'color': '#2a9d8f', 'size': lambda node: (40, 40), 'label': 'name'},
+    'Movie': {'color': 'title', 'type': lambda node: node['properties']['label']},
+    '*': {'color': 'gray', 'scale_factor': 1.5},
+}
+
+
+def per_item_mapper_factory(binding_key: str, configurations: Dict[str, Dict[str, str]],
+                            default_mapping: Callable) -> Callable[[int, Dict], Union[Dict, str]]:
+    """
+    The mapper that resolves the configuration and the arity of the default mapping for every item.
+    """
+    label_text = Neo4jGraphWidget._Neo4jGraphWidget__get_neo4j_item_text
+    label_key_ranks = {key: rank for rank, key in reversed(list(enumerate(['name', 'title', 'text', 'description',
+                                                                             'caption', 'label'])))}
+
+    def mapping(index: int, item: Dict) -> Union[Dict, str]:
+        label = item["properties"]["label"]
+        if ((label in configurations or '*' in configurations)
+                and binding_key in configurations.get(label, configurations.get('*'))):
+            type_configuration = configurations.get(label, configurations.get('*'))
+            if callable(type_configuration[binding_key]):
+                return type_configuration[binding_key](item)
+            if (not isinstance(type_configuration[binding_key], dict) and
+                    type_configuration[binding_key] in item["properties"]):
+                return item["properties"][type_configuration.get(binding_key)]
+            return type_configuration.get(binding_key)
+
+        if binding_key == "label":
+            return label_text(item, label_key_ranks)
+        parameters = inspect.signature(default_mapping).parameters
+        if len(parameters) > 1 and parameters[list(parameters)[0]].annotation == int:
+            return default_mapping(index, item)
+        return default_mapping(item)
+
+    return mapping
+
+
+def create_nodes(count: int) -> List[Dict]:
+    rnd = random.Random(0)
+    labels = rnd.choices(['Person', 'Movie', 'Genre'], weights=[3, 2, 1], k=count)
+    return [{'id': index, 'properties': {'label': label, 'name': f"Node {index}", 'title': f"Title {index}"}}
+            for index, label in enumerate(labels)]
+
+
+def measure(factory: Callable, widget: GraphWidget, nodes: List[Dict], repeat: int) -> float:
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for key in POSSIBLE_NODE_BINDINGS:
+            mapping = factory(key, CONFIGURATIONS, getattr(widget, f"default_node_{key}_mapping"))
+            for index, node in enumerate(nodes):
+                mapping(index, node)
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations)
+
+
+def check_equality(widget: GraphWidget, nodes: List[Dict]) -> None:
+    compiled_factory = Neo4jGraphWidget._Neo4jGraphWidget__configuration_mapper_factory
+    for key in POSSIBLE_NODE_BINDINGS:
+        default_mapping = getattr(widget, f"default_node_{key}_mapping")
+        compiled = compiled_factory(key, CONFIGURATIONS, default_mapping)
+        per_item = per_item_mapper_factory(key, CONFIGURATIONS, default_mapping)
+        for index, node in enumerate(nodes):
+            if compiled(index, node) != per_item(index, node):
+                raise AssertionError(f"the mappers differ for the {key} of node {node['id']}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    widget = GraphWidget()
+    check_equality(widget, create_nodes(1000))
+    for size in args.sizes:
+        nodes = create_nodes(size)
+        per_item = measure(per_item_mapper_factory, widget, nodes, args.repeat)
+        compiled = measure(Neo4jGraphWidget._Neo4jGraphWidget__configuration_mapper_factory, widget, nodes,
+                           args.repeat)
+        print(f"{size:>9} items: per-item dispatch {per_item:8.3f}s, compiled resolvers {compiled:8.3f}s "
+              f"({per_item / compiled:.1f}x)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,187 @@
+"""
+Measures the pipeline of `Neo4jGraphWidget.show_cypher` on synthetic graphs without a database.
+
+Usage:
+    python benchmarks/pipeline.py --sizes 1000 10000 100000 1000000 --output results.json
+    python benchmarks/pipeline.py --baseline results.json --tolerance 0.25
+    python benchmarks/pipeline.py --sizes 100000 --scenarios memory
+
+Each size is the number of elements (a third nodes, two thirds relationships). The stage timings are the pipeline
+statistics of the widget (see `get_pipeline_stats`), the reported values are the medians of the repetitions. With a
+baseline, the script exits with status 1 if a total time regresses by more than the tolerance.
+
+The memory scenario instead reports the tracemalloc peaks and the memory that is still allocated afterward for
+converting the fetched graph into the compact graph, into the widget items (the default, which drops the compact graph),
+into the widget items while the compact graph is retained (see `set_graph_retention`), and for the import of the graph
+by the core widget (`GraphWidget.import_graph`).
+"""
+import argparse
+import contextlib
+import io
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from yfiles_jupyter_graphs import GraphWidget
+from yfiles_jupyter_graphs_for_neo4j import Neo4jGraphWidget, ColumnBinding
+from yfiles_jupyter_graphs_for_neo4j.Yfiles_Neo4j_Graphs import _CompactGraph
+from yfiles_jupyter_graphs_for_neo4j.replay import ReplayDriver
+
+CYPHER = "MATCH (s) OPTIONAL MATCH (s)-[r]->(t) RETURN s,r,t"
+
+
+def configure_plain(widget: Neo4jGraphWidget) -> None:
+    pass
+
+
+def configure_mappings(widget: Neo4jGraphWidget) -> None:
+    widget.add_node_configuration('Person', color='#2a9d8f', size=lambda node: (40, 40), text='name')
+    widget.add_node_configuration('Movie', color='#e76f51', heat=ColumnBinding.min_max('score'))
+    widget.add_relationship_configuration('*', thickness_factor=ColumnBinding.log('weight', 1, 5))
+
+
+def configure_grouping(widget: Neo4jGraphWidget) -> None:
+    widget.add_node_configuration('Person', parent_configuration=lambda node: f"group {node['id'] % 100}")
+
+
+def configure_many_groups(widget: Neo4jGraphWidget) -> None:
+    # a group per node, i.e. 33,333 distinct groups for 100,000 elements
+    for label in ('Person', 'Movie'):
+        widget.add_node_configuration(label, parent_configuration=lambda node: f"group {node['id']}")
+
+
+def configure_parent(widget: Neo4jGraphWidget) -> None:
+    widget.add_parent_relationship_configuration('ACTED_IN')
+
+
+def configure_positions(widget: Neo4jGraphWidget) -> None:
+    widget.set_layout_cache()
+
+
+SCENARIOS = {
+    'plain': (configure_plain, 'total'),
+    'mappings': (configure_mappings, 'map'),
+    'grouping': (configure_grouping, 'group'),
+    'many_groups': (configure_many_groups, 'group'),
+    'parent': (configure_parent, 'parent'),
+    'positions': (configure_positions, 'layout'),
+    'memory': (None, None),
+}
+
+
+def measure(driver: ReplayDriver, configure: Callable[[Neo4jGraphWidget], None], repeat: int) -> Dict[str, float]:
+    """
+    Shows the default response of the driver `repeat` times and returns the median of each stage and the total.
+    """
+    runs = []
+    for _ in range(repeat):
+        widget = Neo4jGraphWidget(driver)
+        configure(widget)
+        # display() prints the widget outside of notebooks
+        with contextlib.redirect_stdout(io.StringIO()):
+            widget.show_cypher(CYPHER)
+        stats = widget.get_pipeline_stats()
+        runs.append({**stats['timings'], 'total': stats['total']})
+    return {stage: statistics.median(run[stage] for run in runs) for stage in runs[0]}
+
+
+def measure_allocations(convert: Callable[[], Any]) -> Dict[str, int]:
+    """
+    Returns the peak of the memory that is allocated by the given conversion and the memory that its result retains,
+    in bytes.
+    """
+    tracemalloc.start()
+    try:
+        result = convert()
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return {'peak': peak, 'retained': retained}
+
+
+def measure_memory(driver: ReplayDriver) -> Dict[str, float]:
+    with driver.session() as session:
+        graph = session.run(CYPHER).graph()
+
+    def import_graph() -> GraphWidget:
+        widget = GraphWidget()
+        widget.import_graph(graph)
+        return widget
+
+    def convert_retained() -> Any:
+        compact_graph = _CompactGraph.from_graph(graph)
+        return compact_graph, compact_graph.to_items()
+
+    return {'compact_graph': measure_allocations(lambda: _CompactGraph.from_graph(graph)),
+            'items': measure_allocations(lambda: _CompactGraph.from_graph(graph).to_items()),
+            'retained': measure_allocations(convert_retained), 'import_graph': measure_allocations(import_graph)}
+
+
+def run(sizes: List[int], scenarios: List[str], repeat: int) -> Dict[str, Dict[str, Dict[str, float]]]:
+    results = {}
+    for size in sizes:
+        start = time.perf_counter()
+        driver = ReplayDriver.synthetic(size // 3, size - size // 3)
+        print(f"{size} elements: generated in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+        for scenario in scenarios:
+            if scenario == 'memory':
+                allocations = measure_memory(driver)
+                results.setdefault(scenario, {})[str(size)] = allocations
+                print(f"{scenario:>11} {size:>9}: " + ", ".join(
+                    f"{name.replace('_', ' ')} {memory['peak'] / 2 ** 20:.1f}/{memory['retained'] / 2 ** 20:.1f}MiB"
+                    for name, memory in allocations.items()) + " (peak/retained)")
+                continue
+            configure, stage = SCENARIOS[scenario]
+            timings = measure(driver, configure, repeat)
+            results.setdefault(scenario, {})[str(size)] = timings
+            print(f"{scenario:>11} {size:>9}: total {timings['total']:8.3f}s, {stage} {timings[stage]:8.3f}s  "
+                  + " ".join(f"{key}={value:.3f}" for key, value in timings.items() if key != 'total'))
+    return results
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    regressions = []
+    for scenario, sizes in results.items():
+        for size, timings in sizes.items():
+            expected = baseline.get(scenario, {}).get(size)
+            if scenario == 'memory':
+                if expected is not None and timings['items']['retained'] > \
+                        expected['items']['retained'] * (1 + tolerance):
+                    regressions.append(f"memory at {size} elements: {timings['items']['retained']} bytes "
+                                       f"instead of {expected['items']['retained']} bytes")
+                continue
+            if expected is not None and timings['total'] > expected['total'] * (1 + tolerance):
+                regressions.append(f"{scenario} at {size} elements: {timings['total']:.3f}s "
+                                   f"instead of {expected['total']:.3f}s")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help="write the results as JSON to this file")
+    parser.add_argument('--baseline', help="compare the totals to the results in this JSON file")
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.scenarios, args.repeat)
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f"regression: {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
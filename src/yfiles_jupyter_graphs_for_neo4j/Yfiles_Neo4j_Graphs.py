@@ -3,200 +3,2781 @@
 The main Neo4jGraphWidget class is defined in this module.
 
 """
-from typing import Any, Callable, Dict, Union, Type, Optional, List
+from typing import Any, Callable, Dict, Union, Type, Optional, List, Tuple, Iterable, Iterator, FrozenSet, \
+    TYPE_CHECKING
 from types import FunctionType, MethodType
+from array import array
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+import base64
+import datetime
 import inspect
+import json
+import logging
+import math
+import mmap
+import os
+import sys
+import tempfile
+import time
+
+if TYPE_CHECKING:
+    # the core widget imports ipywidgets and IPython, which is deferred until a graph is shown
+    from yfiles_jupyter_graphs import GraphWidget
+
+# Updating an already shown widget requires internals of the core widget, which are only accessed by `_CoreMappings`
+# and checked for when it is created. yfiles_jupyter_graphs is limited to the 1.x versions that provide them in
+# pyproject.toml, starting with 1.10.2 for the "no_layout" of the layout cache (see README_DEV.md):
+#   - the mapping functions of the widget's `_mapper` (since 1.10.1) to map the items of a shown widget,
+#   - `_error`, `_errorMessage` and `_scale_widget_layout()` to apply the mappings like `GraphWidget.show()`,
+#   - the `_data_importer` trait to enable the neo4j specific default mappings for the converted items.
 
-from yfiles_jupyter_graphs import GraphWidget
+# TODO maybe change to get dynamically when adding bindings
+
+POSSIBLE_NODE_BINDINGS = {'coordinate', 'color', 'size', 'type', 'styles', 'scale_factor', 'position',
+                          'layout', 'property', 'label'}
+POSSIBLE_EDGE_BINDINGS = {'color', 'thickness_factor', 'styles', 'property', 'label'}
+NEO4J_LABEL_KEYS = ['name', 'title', 'text', 'description', 'caption', 'label']
+COLLAPSE_AGGREGATIONS = {'sum', 'avg', 'min', 'max', 'count'}
+CYPHER_NESTING_DEPTH = 3  # the levels of nested lists and maps whose elements are unwound by the wrapping queries
+PIPELINE_STAGES = ('query', 'fetch', 'convert', 'group', 'layout', 'parent', 'map', 'render')
+SNAPSHOT_MAGIC = b'YJGNEO4J'
+SNAPSHOT_VERSION = 1
+LAYOUT_SPACING = 110.0  # the distance of neighbors that are placed by the default layout function
+# the label group position of each item by its index, and the ids and column binding values of the group's items
+ColumnValues = Tuple[array, List[Any], List[Any]]
+
+logger = logging.getLogger(__name__)
+
+
+class _ElementCounter:
+    """
+    Counts the distinct neo4j nodes and relationships of a result while it is consumed.
+    """
+
+    def __init__(self):
+        self._node_ids = set()
+        self._relationship_ids = set()
+
+    def add(self, entities: Iterable[Any]) -> int:
+        for entity in entities:
+            if hasattr(entity, 'start_node'):
+                self._relationship_ids.add(entity.element_id)
+            else:
+                self._node_ids.add(entity.element_id)
+        return len(self._node_ids) + len(self._relationship_ids)
+
+
+class _CoreMappings:
+    """
+    Maps items with the mapping functions that are installed on a core widget, which otherwise only applies them when
+    it is displayed. This is the only place that accesses the internals of the core widget.
+
+    The mapping functions are provided by the internal mapper of the widget in the 1.x versions of
+    yfiles_jupyter_graphs since 1.10.1, which records the mapping errors on the widget instead of raising them.
+    """
+
+    def __init__(self, widget: "GraphWidget"):
+        mapper = getattr(widget, '_mapper', None)
+        if not all(hasattr(mapper, name) for name in ('_get_node_mapping_functions', '_get_edge_mapping_functions')):
+            raise Exception("updating a shown graph is not supported by this version of yfiles_jupyter_graphs, "
+                            "install yfiles_jupyter_graphs>=1.10.2,<2")
+        self._widget = widget
+        widget._error = None
+        self._node_mappings = mapper._get_node_mapping_functions()
+        self._edge_mappings = mapper._get_edge_mapping_functions()
+
+    def map_node(self, index: int, node: Dict) -> Dict:
+        """
+        Maps the given node dict in place, where `index` is its index in the node list.
+        """
+        for mapping in self._node_mappings:
+            node = mapping(index, node)
+        return node
+
+    def map_edge(self, index: int, edge: Dict) -> Dict:
+        """
+        Maps the given edge dict in place, where `index` is its index in the edge list.
+        """
+        for mapping in self._edge_mappings:
+            edge = mapping(index, edge)
+        return edge
+
+    def map_items(self, nodes: List[Dict], edges: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Maps the given node and edge dicts in place, which are not yet assigned to the widget.
+        """
+        return ([self.map_node(index, node) for index, node in enumerate(nodes)],
+                [self.map_edge(index, edge) for index, edge in enumerate(edges)])
+
+    def raise_error(self) -> None:
+        """
+        Raises the first error of the mapping functions, if any.
+        """
+        error = getattr(self._widget, '_error', None)
+        if error is not None:
+            raise Exception(self._widget._errorMessage) from error
+
+    def scale_layout(self) -> None:
+        """
+        Scales the height of the widget to the number of nodes like the core widget does when it is displayed.
+        """
+        scale = getattr(self._widget, '_scale_widget_layout', None)
+        if scale is not None:
+            # assigns a new Layout, which is synchronized even if the height is unchanged
+            scale()
+
+    @staticmethod
+    def mark_neo4j_import(widget: "GraphWidget") -> None:
+        """
+        Enables the neo4j specific default mappings of the core widget for the items of the given widget, which only
+        considers the neo4j item types for imported graphs and marks them with the `_data_importer` trait.
+        """
+        if widget.has_trait('_data_importer'):
+            widget._data_importer = 'neo4j'
+
+
+class _CompactGraph:
+    """
+    Stores the nodes and relationships of a query result column-wise until they are converted into widget items.
+
+    Instead of a dict per element and another dict for its properties, each element is a row in typed arrays with its
+    sanitized property values as tuple. The node labels, relationship types and property key tuples are shared between
+    the elements and referenced by a code.
+
+    The optional node and relationship projections map each node label or relationship type (or "*" for all others)
+    to the property keys that are kept, or None to keep all properties. The properties whose lowercase key is one of
+    NEO4J_LABEL_KEYS are always kept.
+    """
+    __slots__ = ('_labels', '_label_codes', '_keys', '_key_codes',
+                 '_node_projection', '_node_shapes', '_relationship_projection', '_relationship_shapes',
+                 'node_ids', 'node_labels', 'node_keys', 'node_values',
+                 'relationship_ids', 'relationship_starts', 'relationship_ends', 'relationship_types',
+                 'relationship_keys', 'relationship_values', 'summary_nodes', 'summary_edges', 'collapsed_members')
+
+    def __init__(self, node_projection: Optional[Dict[str, Optional[FrozenSet[str]]]] = None,
+                 relationship_projection: Optional[Dict[str, Optional[FrozenSet[str]]]] = None):
+        self._labels = []  # code -> node labels or relationship type
+        self._label_codes = {}
+        self._keys = []  # code -> tuple of property keys
+        self._key_codes = {}
+        self._node_projection = node_projection
+        self._node_shapes = {}  # (label code, property keys) -> (projected keys code, kept indices)
+        self._relationship_projection = relationship_projection
+        self._relationship_shapes = {}
+        # the legacy neo4j ids, which identify the items of the core widget
+        self.node_ids = array('q')
+        self.node_labels = array('I')
+        self.node_keys = array('I')
+        self.node_values = []
+        self.relationship_ids = array('q')
+        self.relationship_starts = array('q')
+        self.relationship_ends = array('q')
+        self.relationship_types = array('I')
+        self.relationship_keys = array('I')
+        self.relationship_values = []
+        # the items of collapsed nodes and their aggregated relationships, see `collapse_configuration`
+        self.summary_nodes = []
+        self.summary_edges = []
+        self.collapsed_members = {}  # summary node id -> legacy ids of the collapsed nodes
+
+    @classmethod
+    def from_graph(cls, graph: Any, node_projection: Optional[Dict[str, Optional[FrozenSet[str]]]] = None,
+                   relationship_projection: Optional[Dict[str, Optional[FrozenSet[str]]]] = None) -> "_CompactGraph":
+        compact_graph = cls(node_projection, relationship_projection)
+        for node in graph.nodes:
+            compact_graph.add_node(node)
+        for relationship in graph.relationships:
+            compact_graph.add_relationship(relationship)
+        return compact_graph
+
+    @property
+    def node_count(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def relationship_count(self) -> int:
+        return len(self.relationship_ids)
+
+    def add_node(self, node: Any) -> int:
+        """
+        Adds the given neo4j node and returns its row.
+        """
+        label = self.__get_label_code(":".join(node.labels))
+        keys_code, values = self.__get_properties(label, node, self._node_projection, self._node_shapes)
+        self.node_ids.append(node.id)
+        self.node_labels.append(label)
+        self.node_keys.append(keys_code)
+        self.node_values.append(values)
+        return len(self.node_ids) - 1
+
+    def set_node(self, row: int, node: Any) -> None:
+        """
+        Replaces the labels and properties of the node in the given row, e.g. once a node that was only known as
+        relationship endpoint is loaded completely.
+        """
+        label = self.__get_label_code(":".join(node.labels))
+        self.node_labels[row] = label
+        self.node_keys[row], self.node_values[row] = self.__get_properties(label, node, self._node_projection,
+                                                                           self._node_shapes)
+
+    def add_relationship(self, relationship: Any) -> None:
+        label = self.__get_label_code(relationship.type)
+        keys_code, values = self.__get_properties(label, relationship, self._relationship_projection,
+                                                  self._relationship_shapes)
+        self.relationship_ids.append(relationship.id)
+        self.relationship_starts.append(relationship.start_node.id)
+        self.relationship_ends.append(relationship.end_node.id)
+        self.relationship_types.append(label)
+        self.relationship_keys.append(keys_code)
+        self.relationship_values.append(values)
+
+    def to_items(self) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Returns new node and edge items with the same structure as the neo4j import of the core widget.
+        """
+        labels = self._labels
+        keys = self._keys
+        # the edges reference the id objects of their nodes instead of a new int per endpoint
+        node_ids = {}
+        node_items = []
+        for node_id, label, keys_code, values in zip(self.node_ids, self.node_labels, self.node_keys,
+                                                      self.node_values):
+            properties = dict(zip(keys[keys_code], values))
+            properties["label"] = labels[label]
+            node_ids[node_id] = node_id
+            node_items.append({"id": node_id, "properties": properties})
+        edge_items = []
+        for edge_id, start, end, label, keys_code, values in zip(
+                self.relationship_ids, self.relationship_starts, self.relationship_ends, self.relationship_types,
+                self.relationship_keys, self.relationship_values):
+            properties = dict(zip(keys[keys_code], values))
+            properties["label"] = labels[label]
+            edge_items.append({"id": edge_id, "start": node_ids.get(start, start), "end": node_ids.get(end, end),
+                               "properties": properties})
+        node_items.extend({**item, "properties": dict(item["properties"])} for item in self.summary_nodes)
+        edge_items.extend({**item, "properties": dict(item["properties"])} for item in self.summary_edges)
+        return node_items, edge_items
+
+    def merged(self, other: "_CompactGraph", removed_ids: FrozenSet[Any] = frozenset()) -> "_CompactGraph":
+        """
+        Returns a new compact graph with the rows of this and the given graph, without the summary items of the given
+        removed summary nodes. Neither graph is modified, since they may be cached.
+        """
+        merged = _CompactGraph(self._node_projection, self._relationship_projection)
+        for graph in (self, other):
+            labels = [merged.__get_label_code(label) for label in graph._labels]
+            keys = [merged.__get_keys_code(keys) for keys in graph._keys]
+            merged.node_ids.extend(graph.node_ids)
+            merged.node_labels.extend(labels[code] for code in graph.node_labels)
+            merged.node_keys.extend(keys[code] for code in graph.node_keys)
+            merged.node_values.extend(graph.node_values)
+            merged.relationship_ids.extend(graph.relationship_ids)
+            merged.relationship_starts.extend(graph.relationship_starts)
+            merged.relationship_ends.extend(graph.relationship_ends)
+            merged.relationship_types.extend(labels[code] for code in graph.relationship_types)
+            merged.relationship_keys.extend(keys[code] for code in graph.relationship_keys)
+            merged.relationship_values.extend(graph.relationship_values)
+            merged.summary_nodes.extend(item for item in graph.summary_nodes if item['id'] not in removed_ids)
+            merged.summary_edges.extend(item for item in graph.summary_edges
+                                        if item['start'] not in removed_ids and item['end'] not in removed_ids)
+            merged.collapsed_members.update((summary_id, members) for summary_id, members
+                                            in graph.collapsed_members.items() if summary_id not in removed_ids)
+        return merged
+
+    def save(self, path: str, metadata: Dict[str, Any]) -> None:
+        """
+        Writes this graph and the given JSON metadata as snapshot file.
+
+        The file starts with SNAPSHOT_MAGIC, the length of the JSON header and the header, followed by the 8 byte
+        aligned raw arrays of the integer columns and the JSON encoded property values. The header contains the
+        label and key tables, the summary items, the metadata and the location of each section.
+        """
+        columns = {
+            'node_ids': self.node_ids, 'node_labels': self.node_labels, 'node_keys': self.node_keys,
+            'relationship_ids': self.relationship_ids, 'relationship_starts': self.relationship_starts,
+            'relationship_ends': self.relationship_ends, 'relationship_types': self.relationship_types,
+            'relationship_keys': self.relationship_keys,
+            'collapsed_member_ids': array('q', (member_id for members in self.collapsed_members.values()
+                                                for member_id in members))
+        }
+        sections = []
+        offset = 0
+        locations = {}
+        for name, column in columns.items():
+            data = column.tobytes() if isinstance(column, array) else bytes(column)
+            typecode = column.typecode if isinstance(column, array) else column.format
+            locations[name] = [typecode, array(typecode).itemsize, offset, len(column)]
+            sections.append(data + bytes(-len(data) % 8))
+            offset += len(sections[-1])
+        _CompactGraph.__check_values(self.node_values)
+        _CompactGraph.__check_values(self.relationship_values)
+        values = json.dumps([self.node_values, self.relationship_values], separators=(',', ':'),
+                            default=_CompactGraph.__encode_value).encode('utf-8')
+        locations['values'] = ['B', 1, offset, len(values)]
+        sections.append(values)
+
+        header = json.dumps({
+            'version': SNAPSHOT_VERSION,
+            'byteorder': sys.byteorder,
+            'labels': self._labels,
+            'keys': self._keys,
+            'summary_nodes': self.summary_nodes,
+            'summary_edges': self.summary_edges,
+            'collapsed_members': [[summary_id, len(members)] for summary_id, members
+                                  in self.collapsed_members.items()],
+            'sections': locations,
+            'metadata': metadata
+        }, separators=(',', ':'), default=_CompactGraph.__encode_value).encode('utf-8')
+        # written next to the file and moved onto it, so that an existing file is never truncated while it is read
+        file = tempfile.NamedTemporaryFile('wb', dir=os.path.dirname(os.path.abspath(path)), prefix='.snapshot-',
+                                           delete=False)
+        try:
+            with file:
+                file.write(SNAPSHOT_MAGIC)
+                file.write(len(header).to_bytes(8, 'little'))
+                file.write(header)
+                file.write(bytes(-len(header) % 8))
+                for section in sections:
+                    file.write(section)
+            os.replace(file.name, path)
+        except BaseException:
+            os.remove(file.name)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> Tuple["_CompactGraph", Dict[str, Any]]:
+        """
+        Reads a snapshot file that is written by `save` and returns the graph and the metadata.
+
+        The integer columns are copied from a memory map of the file into arrays without decoding, and the map is
+        closed before returning, so that the file can be replaced or deleted while the graph is used.
+        """
+        with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer, \
+                memoryview(buffer) as view:
+            return cls.__read_snapshot(path, buffer, view)
+
+    @classmethod
+    def __read_snapshot(cls, path: str, buffer: mmap.mmap,
+                        view: memoryview) -> Tuple["_CompactGraph", Dict[str, Any]]:
+        if buffer[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is not a snapshot file")
+        header_start = len(SNAPSHOT_MAGIC) + 8
+        header_length = int.from_bytes(buffer[len(SNAPSHOT_MAGIC):header_start], 'little')
+        header = json.loads(buffer[header_start:header_start + header_length],
+                            object_hook=_CompactGraph.__decode_value)
+        if header['version'] != SNAPSHOT_VERSION:
+            raise ValueError(f"unsupported snapshot version {header['version']}, expected {SNAPSHOT_VERSION}")
+        data_start = header_start + header_length + (-header_length % 8)
+
+        columns = {}
+        for name, (typecode, itemsize, offset, length) in header['sections'].items():
+            if name == 'values':
+                continue
+            column = array(typecode)
+            if column.itemsize != itemsize:
+                raise ValueError("the snapshot was written on an incompatible platform")
+            start = data_start + offset
+            # the slice is released right away, since the map can only be closed without exported buffers
+            with view[start:start + length * itemsize] as data:
+                column.frombytes(data)
+            if header['byteorder'] != sys.byteorder:
+                column.byteswap()
+            columns[name] = column
+        _, _, offset, length = header['sections']['values']
+        node_values, relationship_values = json.loads(buffer[data_start + offset:data_start + offset + length],
+                                                      object_hook=_CompactGraph.__decode_value)
+
+        compact_graph = cls()
+        for label in header['labels']:
+            compact_graph.__get_label_code(label)
+        for keys in header['keys']:
+            compact_graph.__get_keys_code(tuple(keys))
+        compact_graph.node_ids = columns['node_ids']
+        compact_graph.node_labels = columns['node_labels']
+        compact_graph.node_keys = columns['node_keys']
+        compact_graph.node_values = node_values
+        compact_graph.relationship_ids = columns['relationship_ids']
+        compact_graph.relationship_starts = columns['relationship_starts']
+        compact_graph.relationship_ends = columns['relationship_ends']
+        compact_graph.relationship_types = columns['relationship_types']
+        compact_graph.relationship_keys = columns['relationship_keys']
+        compact_graph.relationship_values = relationship_values
+        compact_graph.summary_nodes = header['summary_nodes']
+        compact_graph.summary_edges = header['summary_edges']
+        member_ids = columns['collapsed_member_ids']
+        offset = 0
+        for summary_id, count in header['collapsed_members']:
+            compact_graph.collapsed_members[summary_id] = member_ids[offset:offset + count]
+            offset += count
+        return compact_graph, header['metadata']
+
+    @staticmethod
+    def __encode_value(value: Any) -> Any:
+        if isinstance(value, datetime.datetime):
+            return {'$datetime': value.isoformat()}
+        if isinstance(value, (bytes, bytearray)):
+            return {'$bytes': base64.b64encode(value).decode('ascii')}
+        # e.g. neo4j durations and times, which are not converted for the frontend either
+        raise ValueError(f"the {type(value).__name__} property value {value!r} cannot be saved in a snapshot, "
+                         f"drop its property with set_property_projection")
+
+    @staticmethod
+    def __check_values(rows: List[Tuple]) -> None:
+        """
+        Raises a ValueError for the property values that json would write as lists, i.e. tuples like neo4j durations,
+        since they do not reach `__encode_value`.
+        """
+        for row in rows:
+            for value in row:
+                for element in value if isinstance(value, list) else (value,):
+                    if isinstance(element, tuple):
+                        _CompactGraph.__encode_value(element)
+
+    @staticmethod
+    def __decode_value(value: Dict[str, Any]) -> Any:
+        if len(value) == 1 and '$datetime' in value:
+            return datetime.datetime.fromisoformat(value['$datetime'])
+        if len(value) == 1 and '$bytes' in value:
+            return base64.b64decode(value['$bytes'])
+        if len(value) == 1 and '$tuple' in value:
+            return tuple(value['$tuple'])
+        return value
+
+    def __get_label_code(self, label: str) -> int:
+        code = self._label_codes.get(label)
+        if code is None:
+            code = self._label_codes[label] = len(self._labels)
+            self._labels.append(label)
+        return code
+
+    def __get_keys_code(self, keys: Tuple[str, ...]) -> int:
+        code = self._key_codes.get(keys)
+        if code is None:
+            # the driver creates new key strings for each record
+            keys = tuple(map(sys.intern, keys))
+            code = self._key_codes[keys] = len(self._keys)
+            self._keys.append(keys)
+        return code
+
+    def __get_properties(self, label: int, entity: Any, projection: Optional[Dict[str, Optional[FrozenSet[str]]]],
+                         shapes: Dict[Tuple, Tuple[int, Tuple[int, ...]]]) -> Tuple[int, Tuple]:
+        """
+        Returns the code of the (projected) property keys of the given entity and the sanitized property values.
+        """
+        keys = tuple(entity.keys())
+        if projection is None:
+            return self.__get_keys_code(keys), tuple(map(_CompactGraph.__sanitize_neo4j_value, entity.values()))
+        shape = shapes.get((label, keys))
+        if shape is None:
+            kept_keys = projection.get(self._labels[label], projection['*'])
+            indices = tuple(index for index, key in enumerate(keys)
+                            if kept_keys is None or key in kept_keys or key.lower() in NEO4J_LABEL_KEYS)
+            shape = shapes[(label, keys)] = (self.__get_keys_code(tuple(keys[index] for index in indices)), indices)
+        keys_code, indices = shape
+        values = tuple(entity.values())
+        # the dropped values are not even sanitized
+        return keys_code, tuple(_CompactGraph.__sanitize_neo4j_value(values[index]) for index in indices)
+
+    @staticmethod
+    def __sanitize_neo4j_value(value: Any) -> Any:
+        if value is None or isinstance(value, (str, int, float, list)):
+            return value
+        # neo4j temporal and spatial values cannot be synchronized with the frontend
+        from neo4j.time import Date, DateTime
+        from neo4j.spatial import Point
+
+        if isinstance(value, DateTime):
+            return datetime.datetime(value.year, value.month, value.day, value.hour, value.minute, int(value.second),
+                                     int(value.second * 1000000 % 1000000), tzinfo=value.tzinfo)
+        if isinstance(value, Date):
+            return datetime.datetime(value.year, value.month, value.day, tzinfo=datetime.timezone.utc)
+        if isinstance(value, Point):
+            return {"x": value[0], "y": value[1], "z": value[2] if len(value) > 2 else 0}
+        return value
+
+
+class ColumnBinding:
+    """
+    A configuration binding that is evaluated once for the values of a property across all nodes of a label (or all
+    relationships of a type) instead of once per item, e.g. to normalize a heat binding against the whole result.
+    Requires NumPy.
+
+    The column is only evaluated when a graph is shown or restyled, the items that are added to a shown graph with
+    `add_cypher` or `expand` use the default binding until the graph is restyled (see `restyle`).
+
+    Example:
+        g.add_node_configuration('Person', heat=ColumnBinding.min_max('age'))
+    """
+
+    # noinspection PyShadowingBuiltins
+    def __init__(self, property: str, function: Callable[[Any], Any]):
+        """
+        Initializes a new column binding.
+
+        Args:
+            property (str): The property whose values are passed to the function as float NumPy array. Missing values
+                and values that cannot be converted to float are NaN.
+            function (Callable[[numpy.ndarray], Any]): Returns the binding values for the given column as a sequence of
+                the same length. The items whose value is None or NaN use the default binding instead.
+        """
+        self.property = property
+        self.function = function
+
+    # noinspection PyShadowingBuiltins
+    @classmethod
+    def min_max(cls, property: str, lower: float = 0.0, upper: float = 1.0) -> "ColumnBinding":
+        """
+        Linearly scales the values of the given property from their minimum and maximum to [`lower`, `upper`].
+        """
+        return cls(property, lambda column: ColumnBinding.__scale(column, lower, upper))
+
+    # noinspection PyShadowingBuiltins
+    @classmethod
+    def log(cls, property: str, lower: float = 0.0, upper: float = 1.0) -> "ColumnBinding":
+        """
+        Scales the logarithm of the values of the given property to [`lower`, `upper`], which spreads skewed values like
+        degrees or counts. Negative values are treated as 0.
+        """
+        return cls(property, lambda column: ColumnBinding.__scale_logarithm(column, lower, upper))
+
+    # noinspection PyShadowingBuiltins
+    @classmethod
+    def quantile(cls, property: str, lower: float = 0.0, upper: float = 1.0) -> "ColumnBinding":
+        """
+        Maps the values of the given property to their quantile (the average rank among all values), scaled to
+        [`lower`, `upper`], which evenly spreads the values regardless of their distribution. Equal values, including a
+        single value, are mapped to their average quantile, e.g. to the middle if all values are equal.
+        """
+        return cls(property, lambda column: ColumnBinding.__rank(column, lower, upper))
+
+    @staticmethod
+    def __scale(column: Any, lower: float, upper: float) -> Any:
+        import numpy as np
+
+        if np.isnan(column).all():
+            return column
+        minimum = np.nanmin(column)
+        extent = np.nanmax(column) - minimum
+        if extent == 0:
+            return np.where(np.isnan(column), np.nan, lower)
+        return lower + (column - minimum) * ((upper - lower) / extent)
+
+    @staticmethod
+    def __scale_logarithm(column: Any, lower: float, upper: float) -> Any:
+        import numpy as np
+
+        return ColumnBinding.__scale(np.log1p(np.clip(column, 0, None)), lower, upper)
+
+    @staticmethod
+    def __rank(column: Any, lower: float, upper: float) -> Any:
+        import numpy as np
+
+        values = np.sort(column[~np.isnan(column)])
+        if len(values) < 2:
+            # the average rank of a single value, like the average rank of equal values
+            return np.where(np.isnan(column), np.nan, (lower + upper) / 2)
+        # the average of the first and last rank of equal values
+        ranks = (np.searchsorted(values, column, side='left') + np.searchsorted(values, column, side='right') - 1) / 2
+        return np.where(np.isnan(column), np.nan, lower + ranks * ((upper - lower) / (len(values) - 1)))
+
+
+class Neo4jGraphWidget:
+    """
+    A yFiles Graphs for Jupyter widget that is tailored to visualize Cypher queries resolved against a Neo4j database.
+    """
+
+    # noinspection PyShadowingBuiltins
+    def __init__(self, driver: Optional[Any] = None, widget_layout: Optional[Any] = None,
+                 overview_enabled: Optional[bool] = None, context_start_with: Optional[str] = None,
+                 license: Optional[Dict] = None,
+                 autocomplete_relationships: Optional[bool] = False, layout: Optional[str] = 'organic'):
+        """
+        Initializes a new instance of the Neo4jGraphWidget class.
+
+        Args:
+            driver (Optional[neo4j._sync.driver.Neo4jDriver]): The Neo4j driver to resolve the Cypher queries.
+                Use an async driver (neo4j.AsyncGraphDatabase.driver) for `show_cypher_async`.
+            widget_layout (Optional[ipywidgets.Layout]): Can be used to specify general widget appearance through css attributes.
+                See ipywidgets documentation for the available keywords.
+            overview_enabled (Optional[bool]): Whether the graph overview is enabled or not.
+            context_start_with (Optional[str]): Start with a specific side-panel opened in the interactive widget. Starts with closed side-panel by default.
+            license (Optional[Dict]): The widget works on common public domains without a specific license.
+                For unknown domains, a license can be obtained by the creators of the widget.
+            autocomplete_relationships (Optional[bool]): Whether missing relationships in the Cypher's return value are automatically added.
+            layout (Optional[str]): Specifies the default automatic graph arrangement. Can be overwritten for each
+                cypher separately. By default, an "organic" layout is used. Supported values are:
+                    - "circular"
+                    - "circular_straight_line"
+                    - "hierarchic"
+                    - "organic"
+                    - "interactive_organic"
+                    - "orthogonal"
+                    - "radial"
+                    - "tree"
+                    - "map"
+                    - "orthogonal_edge_router"
+                    - "organic_edge_router"
+        """
+
+        self._widget = None  # the most recently shown widget
+        self._driver = driver
+        self._wrapped_autocomplete_supported = True  # False once the database of the driver rejected the wrapping
+        self._session_configuration = {}
+        self._transaction_timeout = None
+        self._license = license
+        self._overview = overview_enabled
+        self._layout = widget_layout
+        self._context_start_with = context_start_with
+        self.set_autocomplete_relationships(autocomplete_relationships)
+        self._graph_layout = layout
+
+        self._node_configurations = {}
+        self._edge_configurations = {}
+        self._parent_configurations = {}  # relationship type -> reverse
+
+        self._max_elements = None
+        self._sampling = None
+
+        self._result_cache = None
+        self._result_cache_max_size = 0
+        self._result_cache_ttl = None
+        self._result_cache_stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+        self._layout_cache = None  # node id -> position
+        self._layout_cache_max_size = 0
+        self._layout_cache_layout = None
+        self._layout_function = None
+        self._layout_cache_stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+        self._pipeline_stats = None
+        self._pipeline_stats_callback = None
+
+        self._projection_keys = None
+        self._graph_retention = False
+        self._compact_graph = None  # the result of the most recently shown widget, if retained
+        self._collapsed_members = {}  # summary node id -> legacy ids of the collapsed nodes of the shown widget
+
+    def set_driver(self, driver: Any) -> None:
+        """
+        The Neo4j driver that is used to resolve the Cypher queries.
+
+        Args:
+            driver (neo4j._sync.driver.Neo4jDriver): The Neo4j driver to resolve the Cypher queries.
+
+        Returns:
+            None
+        """
+        self._driver = driver
+        self._wrapped_autocomplete_supported = True
+        if self._result_cache is not None:
+            self._result_cache.clear()
+
+    def close(self) -> None:
+        """
+        Closes the driver and releases the loaded results, i.e. the result cache and the elements of the most recently
+        shown graph. The shown widgets stay visible. The widget can also be used as context manager, which is closed on
+        exit.
+
+        Returns:
+            None
+
+        Raises:
+            Exception: If the driver is an async driver, which is closed with `aclose`.
+        """
+        if self._driver is not None:
+            if inspect.iscoroutinefunction(self._driver.close):
+                raise Exception("an async driver is closed with aclose")
+            self._driver.close()
+        self.__release()
+
+    async def aclose(self) -> None:
+        """
+        The asynchronous variant of `close` for async drivers. The widget can also be used as async context manager,
+        which is closed on exit.
+
+        Returns:
+            None
+        """
+        if self._driver is not None:
+            closed = self._driver.close()
+            if inspect.isawaitable(closed):
+                await closed
+        self.__release()
+
+    def __release(self) -> None:
+        self._driver = None
+        if self._result_cache is not None:
+            self._result_cache.clear()
+        self._compact_graph = None
+        self._collapsed_members = {}
+
+    def __enter__(self) -> "Neo4jGraphWidget":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    async def __aenter__(self) -> "Neo4jGraphWidget":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    def __new_widget(self) -> "GraphWidget":
+        from yfiles_jupyter_graphs import GraphWidget
+
+        return GraphWidget(overview_enabled=self._overview, context_start_with=self._context_start_with,
+                           widget_layout=self._layout, license=self._license)
+
+    def get_driver(self) -> Any:
+        """
+        Gets the configured Neo4j driver.
+
+        Returns:
+            neo4j._sync.driver.Neo4jDriver
+        """
+        return self._driver
+
+    def set_session_configuration(self, database: Optional[str] = None, fetch_size: Optional[int] = None,
+                                  read_only: Optional[bool] = False, transaction_timeout: Optional[float] = None,
+                                  **kwargs: Dict[str, Any]) -> None:
+        """
+        Configures the sessions that are used to resolve the Cypher queries. A short-lived session is acquired from
+        the connection pool of the driver for each query, so a dropped connection does not affect later queries.
+
+        Args:
+            database (Optional[str]): The database against which the queries are resolved. By default, the default
+                database of the driver is used.
+            fetch_size (Optional[int]): The number of records that are fetched from the database at once.
+            read_only (Optional[bool]): Whether the queries only read data, which routes them to the read replicas of a
+                cluster instead of the leader.
+            transaction_timeout (Optional[float]): The number of seconds after which the database terminates a query.
+            **kwargs (Dict[str, Any]): Additional session configuration that is passed to `driver.session`, for
+                example `bookmarks`, `bookmark_manager` or `impersonated_user`.
+
+        Returns:
+            None
+        """
+        configuration = dict(kwargs)
+        if database is not None:
+            configuration['database'] = database
+        if fetch_size is not None:
+            configuration['fetch_size'] = fetch_size
+        if read_only:
+            configuration['default_access_mode'] = 'READ'
+        self._session_configuration = configuration
+        self._transaction_timeout = transaction_timeout
+
+    def get_session_configuration(self) -> Dict[str, Any]:
+        """
+        Gets the configuration of the sessions that are used to resolve the Cypher queries.
+
+        Returns:
+            Dict[str, Any]: The keyword arguments for `driver.session` and the `transaction_timeout`.
+        """
+        return {**self._session_configuration, 'transaction_timeout': self._transaction_timeout}
+
+    def set_element_budget(self, max_elements: Optional[int], sampling: Optional[str] = None) -> None:
+        """
+        Limits the number of nodes and relationships that are loaded for a Cypher query. The result is consumed
+        record by record and the remaining records are discarded as soon as the budget is exceeded, so an oversize
+        result is never transferred completely.
+
+        By default, an exception is raised for oversize results. With `sampling`, a sample of the result is shown
+        instead, which is resolved by the database: the sampled nodes of the result and the relationships between them
+        in the database (only of the autocompleted types if autocompletion is limited to types).
+
+        Queries with collapse configurations (see `collapse_configuration` in `add_node_configuration`) skip the
+        element budget, since the database aggregates the collapsed elements instead.
+
+        Args:
+            max_elements (Optional[int]): The maximum number of nodes and relationships. None removes the budget.
+            sampling (Optional[str]): How oversize results are sampled. Supported values are:
+                - "random": A random sample of the returned nodes.
+                - "degree": The returned nodes with the most relationships in the database.
+
+        Returns:
+            None
+
+        Raises:
+            ValueError: If `max_elements` is not positive or `sampling` is not supported.
+        """
+        if max_elements is not None and max_elements < 1:
+            raise ValueError("max_elements must be a positive number")
+        if sampling not in (None, 'random', 'degree'):
+            raise ValueError("sampling must be one of 'random' or 'degree'")
+        self._max_elements = max_elements
+        self._sampling = sampling
+
+    def get_element_budget(self) -> Dict[str, Any]:
+        """
+        Gets the configured element budget.
+
+        Returns:
+            Dict[str, Any]: The `max_elements` and the `sampling` of the element budget.
+        """
+        return {'max_elements': self._max_elements, 'sampling': self._sampling}
+
+    def __get_budgeted_graph(self, result: Any) -> Any:
+        """
+        Consumes the given result while its elements fit into the element budget.
+
+        Returns:
+            Optional[neo4j.graph.Graph]: The graph of the result, or None if the result exceeds the budget and should
+            be sampled instead.
+
+        Raises:
+            Exception: If the result exceeds the budget and no sampling is configured.
+        """
+        if self._max_elements is None:
+            return result.graph()
+        counter = _ElementCounter()
+        for record in result:
+            if counter.add(Neo4jGraphWidget.__iter_graph_entities(record.values())) > self._max_elements:
+                # discard the remaining records without transferring them
+                result.consume()
+                return self.__on_budget_exceeded()
+        return result.graph()
+
+    async def __get_budgeted_graph_async(self, result: Any) -> Any:
+        """
+        The asynchronous variant of `__get_budgeted_graph`.
+        """
+        if self._max_elements is None:
+            return await result.graph()
+        counter = _ElementCounter()
+        async for record in result:
+            if counter.add(Neo4jGraphWidget.__iter_graph_entities(record.values())) > self._max_elements:
+                await result.consume()
+                return self.__on_budget_exceeded()
+        return await result.graph()
+
+    def __on_budget_exceeded(self) -> None:
+        if self._sampling is None:
+            raise Exception(f"the query result exceeds the element budget of {self._max_elements} elements, "
+                            f"use a more specific query or configure sampling with set_element_budget")
+        return None
+
+    def __get_sampled_graph(self, session: Any, cypher: str, **kwargs: Dict[str, Any]) -> Any:
+        """
+        Resolves a sample of the given Cypher query's result, see `set_element_budget`.
+
+        Returns:
+            neo4j.graph.Graph: The graph of the sampled nodes and the relationships between them.
+        """
+        sampling_cypher, parameters = self.__get_sampling_cypher(
+            self.__get_result_columns(session.run(f"EXPLAIN {cypher}", **kwargs)), cypher)
+        return session.run(self.__to_query(sampling_cypher), **kwargs, **parameters).graph()
+
+    @staticmethod
+    def __get_result_columns(explain_result: Any) -> List[str]:
+        """
+        Returns the columns of an EXPLAIN result, which only plans the query and therefore returns no records.
+        """
+        return list(explain_result.keys())
+
+    def __get_sampling_cypher(self, columns: List[str], cypher: str) -> Tuple[str, Dict[str, Any]]:
+        """
+        Wraps the given Cypher query, so that the database samples the returned nodes and only returns the sampled
+        nodes and the relationships between them within the element budget.
+
+        The sample is taken while the rows of the query are streamed (top-k of the distinct nodes), so that the
+        database neither collects all returned nodes nor all returned relationships.
+
+        Returns:
+            Tuple[str, Dict[str, Any]]: The wrapped query and its additional parameters.
+        """
+        order = "rand()" if self._sampling == 'random' else "COUNT { (n)--() } DESC"
+        reltypes_expr = self._get_relationship_types_expression() if self._is_autocomplete_enabled() else ""
+        parameters = {'__max_elements': self._max_elements, '__sample_size': max(1, self._max_elements // 2)}
+        if reltypes_expr:
+            parameters['relationship_types'] = self._autocomplete_relationships
+        return f"""
+            {Neo4jGraphWidget.__get_unwound_items_cypher(cypher, columns)}
+            UNWIND CASE
+                WHEN __item IS :: NODE THEN [__item]
+                WHEN __item IS :: RELATIONSHIP THEN [startNode(__item), endNode(__item)]
+                WHEN __item IS :: PATH THEN nodes(__item)
+                ELSE []
+            END AS n
+            WITH DISTINCT n
+            ORDER BY {order}
+            LIMIT $__sample_size
+            WITH collect(n) AS __sample
+            CALL {{
+                WITH __sample
+                UNWIND __sample AS n
+                MATCH (n)-[rel]->(m)
+                WHERE m IN __sample
+                {reltypes_expr}
+                RETURN collect(rel) AS __induced
+            }}
+            RETURN __sample AS nodes, __induced[..($__max_elements - size(__sample))] AS relationships
+        """, parameters
+
+    def __open_session(self) -> Any:
+        return self._driver.session(**self._session_configuration)
+
+    def __to_query(self, cypher: str) -> Any:
+        """
+        Attaches the configured transaction timeout to the given Cypher query.
+        """
+        if self._transaction_timeout is None:
+            return cypher
+        from neo4j import Query
+        return Query(cypher, timeout=self._transaction_timeout)
+
+    def set_autocomplete_relationships(self, autocomplete_relationships: Union[bool, str, list[str]]) -> None:
+        """
+        Sets the flag to enable or disable autocomplete for relationships.
+        When autocomplete is enabled, relationships are automatically completed in the graph,
+        similar to the behavior in Neo4j Browser.
+        This can be set to True/False to enable or disable for all relationships,
+        or a single relationship type or a list of relationship types to enable for specific relationships.
+
+        Args:
+            autocomplete_relationships (Union[bool, str, list[str]]): Enable autocompletion for relationships
+                in general, or for a single type, or for multiple types.
+
+        Returns:
+            None
+        """
+        if not isinstance(autocomplete_relationships, (bool, str, list)):
+            raise ValueError("autocomplete_relationships must be a bool, a string, or a list of strings")
+        if isinstance(autocomplete_relationships, str):
+            self._autocomplete_relationships = [autocomplete_relationships]
+        else:
+            self._autocomplete_relationships = autocomplete_relationships
+
+    def _is_autocomplete_enabled(self) -> bool:
+        if isinstance(self._autocomplete_relationships, bool):
+            return self._autocomplete_relationships
+        return len(self._autocomplete_relationships) > 0
+
+    def _get_relationship_types_expression(self) -> str:
+        if isinstance(self._autocomplete_relationships, list) and len(self._autocomplete_relationships) > 0:
+            return "AND type(rel) IN $relationship_types"
+        return ""
+
+    def show_cypher(self, cypher: str, layout: Optional[str] = None, **kwargs: Dict[str, Any]) -> None:
+        """
+        Displays the given Cypher query as interactive graph.
+
+        Args:
+            cypher (str): The Cypher query whose result should be visualized as graph.
+            layout (Optional[str]): The graph layout for this request. Overwrites the general default `layout` that was
+                specified when initializing the class. Supported values are:
+                    - "circular"
+                    - "circular_straight_line"
+                    - "hierarchic"
+                    - "organic"
+                    - "interactive_organic"
+                    - "orthogonal"
+                    - "radial"
+                    - "tree"
+                    - "map"
+                    - "orthogonal_edge_router"
+                    - "organic_edge_router"
+            **kwargs (Dict[str, Any]): Additional parameters that should be passed to the Cypher query.
+
+        Returns:
+            None
+
+        Raises:
+            Exception: If no driver was specified, or the result exceeds the element budget and no sampling is
+                configured (see `set_element_budget`).
+        """
+        if self._driver is not None:
+            stats = Neo4jGraphWidget.__new_pipeline_stats(cypher)
+            widget = self.__new_widget()
+            compact_graph = self.__get_cached_result(cypher, kwargs)
+            if compact_graph is not None:
+                stats['cached'] = True
+            else:
+                compact_graph = self.__get_compact_graph(stats, cypher, **kwargs)
+                self.__store_cached_result(cypher, kwargs, compact_graph)
+            widget.nodes, widget.edges = self.__get_configured_items(widget, compact_graph, layout, stats)
+
+            self.__set_shown_graph(widget, compact_graph)
+            with Neo4jGraphWidget.__measure(stats, 'render'):
+                widget.show()
+            self.__finish_pipeline_stats(stats, widget)
+        else:
+            raise Exception("no driver specified")
+
+    def __get_compact_graph(self, stats: Dict[str, Any], cypher: str, **kwargs: Dict[str, Any]) -> _CompactGraph:
+        """
+        Resolves the given Cypher query like `__get_graph`, or collapsed by the database if collapse configurations
+        are specified, and converts the result.
+        """
+        collapse = self.__get_collapse_configurations()
+        if collapse is not None:
+            with self.__open_session() as session:
+                with Neo4jGraphWidget.__measure(stats, 'query'):
+                    columns = self.__get_result_columns(session.run(f"EXPLAIN {cypher}", **kwargs))
+                if len(columns) > 0:
+                    with Neo4jGraphWidget.__measure(stats, 'query'):
+                        query, parameters = self.__get_collapse_query(columns, cypher, collapse, kwargs)
+                        result = session.run(query, **parameters)
+                    with Neo4jGraphWidget.__measure(stats, 'fetch'):
+                        rows = [record.values() for record in result]
+                    with Neo4jGraphWidget.__measure(stats, 'convert'):
+                        return self.__to_collapsed_graph(rows, collapse)
+
+        graph = self.__get_graph(stats, cypher, **kwargs)
+        with Neo4jGraphWidget.__measure(stats, 'convert'):
+            return _CompactGraph.from_graph(graph, *self.__get_property_projections())
+
+    def __get_graph(self, stats: Dict[str, Any], cypher: str, **kwargs: Dict[str, Any]) -> Any:
+        """
+        Resolves the given Cypher query within the element budget in a new session and records the query and fetch
+        timings in the given pipeline statistics.
+
+        Returns:
+            neo4j.graph.Graph: The resulting graph.
+        """
+        with self.__open_session() as session:
+            with Neo4jGraphWidget.__measure(stats, 'query'):
+                result = self.__run_cypher(session, cypher, **kwargs)
+            with Neo4jGraphWidget.__measure(stats, 'fetch'):
+                graph = self.__get_budgeted_graph(result)
+                if graph is None:
+                    graph = self.__get_sampled_graph(session, cypher, **kwargs)
+        return graph
+
+    async def show_cypher_async(self, cypher: str, layout: Optional[str] = None, timeout: Optional[float] = None,
+                                **kwargs: Dict[str, Any]) -> None:
+        """
+        Displays the given Cypher query as interactive graph without blocking the event loop of the kernel while the
+        query is resolved. Requires an async Neo4j driver (e.g. created by `neo4j.AsyncGraphDatabase.driver`).
+
+        Each call uses its own session, so several queries can be loaded concurrently, e.g. with `asyncio.gather`.
+        The query is cancelled when the awaiting task is cancelled or when the `timeout` is exceeded.
+
+        Args:
+            cypher (str): The Cypher query whose result should be visualized as graph.
+            layout (Optional[str]): The graph layout for this request. Overwrites the general default `layout` that was
+                specified when initializing the class. See `show_cypher` for the supported values.
+            timeout (Optional[float]): The number of seconds after which the query is cancelled. No timeout by default.
+            **kwargs (Dict[str, Any]): Additional parameters that should be passed to the Cypher query.
+
+        Returns:
+            None
+
+        Raises:
+            Exception: If no driver was specified, the driver is not an async driver, or the result exceeds the element
+                budget and no sampling is configured (see `set_element_budget`).
+            asyncio.TimeoutError: If the query did not finish within the given `timeout`.
+        """
+        if self._driver is None:
+            raise Exception("no driver specified")
+
+        import asyncio
+
+        stats = Neo4jGraphWidget.__new_pipeline_stats(cypher)
+        widget = self.__new_widget()
+        compact_graph = self.__get_cached_result(cypher, kwargs)
+        if compact_graph is not None:
+            stats['cached'] = True
+        else:
+            compact_graph = await asyncio.wait_for(self.__get_compact_graph_async(stats, cypher, **kwargs), timeout)
+            self.__store_cached_result(cypher, kwargs, compact_graph)
+        widget.nodes, widget.edges = self.__get_configured_items(widget, compact_graph, layout, stats)
+
+        self.__set_shown_graph(widget, compact_graph)
+        with Neo4jGraphWidget.__measure(stats, 'render'):
+            widget.show()
+        self.__finish_pipeline_stats(stats, widget)
+
+    async def __get_compact_graph_async(self, stats: Dict[str, Any], cypher: str,
+                                        **kwargs: Dict[str, Any]) -> _CompactGraph:
+        """
+        Resolves and converts the given Cypher query in a new session of the async driver and records the timings in
+        the given pipeline statistics. The autocompleted query is recorded as query stage entirely.
+        """
+        session = self.__open_session()
+        if not hasattr(session, '__aenter__'):
+            session.close()
+            raise Exception("an async driver is required, e.g. created by neo4j.AsyncGraphDatabase.driver")
+        collapse = self.__get_collapse_configurations()
+        async with session:
+            if collapse is not None:
+                with Neo4jGraphWidget.__measure(stats, 'query'):
+                    columns = self.__get_result_columns(await session.run(f"EXPLAIN {cypher}", **kwargs))
+                if len(columns) > 0:
+                    with Neo4jGraphWidget.__measure(stats, 'query'):
+                        query, parameters = self.__get_collapse_query(columns, cypher, collapse, kwargs)
+                        result = await session.run(query, **parameters)
+                    with Neo4jGraphWidget.__measure(stats, 'fetch'):
+                        rows = [record.values() async for record in result]
+                    with Neo4jGraphWidget.__measure(stats, 'convert'):
+                        return self.__to_collapsed_graph(rows, collapse)
+
+            if self._is_autocomplete_enabled():
+                with Neo4jGraphWidget.__measure(stats, 'query'):
+                    graph = await self.__get_autocompleted_graph_async(session, cypher, **kwargs)
+            else:
+                with Neo4jGraphWidget.__measure(stats, 'query'):
+                    result = await session.run(self.__to_query(cypher), **kwargs)
+                with Neo4jGraphWidget.__measure(stats, 'fetch'):
+                    graph = await self.__get_budgeted_graph_async(result)
+            if graph is None:
+                with Neo4jGraphWidget.__measure(stats, 'fetch'):
+                    sampling_cypher, parameters = self.__get_sampling_cypher(self.__get_result_columns(
+                        await session.run(f"EXPLAIN {cypher}", **kwargs)), cypher)
+                    result = await session.run(self.__to_query(sampling_cypher), **kwargs, **parameters)
+                    graph = await result.graph()
+        with Neo4jGraphWidget.__measure(stats, 'convert'):
+            return _CompactGraph.from_graph(graph, *self.__get_property_projections())
+
+    def show_cyphers(self, cyphers: List[Union[str, Tuple[str, Dict[str, Any]]]], layout: Optional[str] = None,
+                     columns: int = 2, max_workers: Optional[int] = None) -> None:
+        """
+        Displays the given Cypher queries as a grid of interactive graphs, e.g. one per tenant.
+
+        The queries are resolved and converted concurrently, each in its own session of the driver's connection pool,
+        so that the total latency is close to the latency of the slowest query. All graphs use the same
+        configurations. Afterward, the last graph is the most recently shown widget.
+
+        Args:
+            cyphers (List[Union[str, Tuple[str, Dict[str, Any]]]]): The Cypher queries, optionally with their
+                parameters as (cypher, parameters) tuples.
+            layout (Optional[str]): The graph layout of all graphs, see `show_cypher`.
+            columns (int): The number of graphs per row of the grid.
+            max_workers (Optional[int]): The maximum number of queries that are resolved concurrently. By default, all
+                queries, but at most 8.
+
+        Returns:
+            None
+
+        Raises:
+            Exception: If no driver was specified, or a query fails or exceeds the element budget (see
+                `set_element_budget`).
+        """
+        if self._driver is None:
+            raise Exception("no driver specified")
+        queries = [(cypher, {}) if isinstance(cypher, str) else cypher for cypher in cyphers]
+        if len(queries) == 0:
+            return
+        all_stats = [Neo4jGraphWidget.__new_pipeline_stats(cypher) for cypher, _ in queries]
+        # the result cache is only accessed from this thread
+        compact_graphs = [self.__get_cached_result(cypher, kwargs) for cypher, kwargs in queries]
+        for stats, compact_graph in zip(all_stats, compact_graphs):
+            stats['cached'] = compact_graph is not None
+
+        missing = [index for index, compact_graph in enumerate(compact_graphs) if compact_graph is None]
+        if len(missing) > 0:
+            from concurrent.futures import ThreadPoolExecutor
+
+            with ThreadPoolExecutor(max_workers=max_workers or min(len(missing), 8)) as executor:
+                futures = {index: executor.submit(self.__get_compact_graph, all_stats[index], queries[index][0],
+                                                  **queries[index][1]) for index in missing}
+                for index, future in futures.items():
+                    compact_graphs[index] = future.result()
+                    self.__store_cached_result(*queries[index], compact_graphs[index])
+
+        widgets = []
+        all_items = []
+        for stats, compact_graph in zip(all_stats, compact_graphs):
+            widget = self.__new_widget()
+            all_items.append(self.__get_configured_items(widget, compact_graph, layout, stats))
+            widgets.append(widget)
+
+        self.__set_shown_graph(widgets[-1], compact_graphs[-1])
+        from IPython.display import display
+        from ipywidgets import GridBox, Layout
+
+        grid = GridBox(children=widgets, layout=Layout(grid_template_columns=f"repeat({columns}, 1fr)"))
+        start = time.perf_counter()
+        for widget, (nodes, edges) in zip(widgets, all_items):
+            Neo4jGraphWidget.__apply_core_mappings(widget, nodes, edges)
+        display(grid)
+        render = time.perf_counter() - start
+        for stats, widget in zip(all_stats, widgets):
+            # the graphs are rendered together, so each one records the rendering of the grid
+            stats['timings']['render'] += render
+            self.__finish_pipeline_stats(stats, widget)
+
+    def show_cypher_streaming(self, cypher: str, layout: Optional[str] = None, batch_size: int = 1000,
+                              max_elements: Optional[int] = None, **kwargs: Dict[str, Any]) -> None:
+        """
+        Displays the given Cypher query as interactive graph while its result is still being consumed.
+
+        The records are consumed in batches of `batch_size`. The graph is shown as soon as the first batch is loaded
+        and is extended in place with the following batches, while a label reports the loading progress. Since every
+        update synchronizes all elements with the frontend, the shown graph is only updated when the number of newly
+        loaded elements reached the number of already shown elements, and once the result is consumed completely.
+
+        Args:
+            cypher (str): The Cypher query whose result should be visualized as graph.
+            layout (Optional[str]): The graph layout for this request. Overwrites the general default `layout` that was
+                specified when initializing the class. See `show_cypher` for the supported values.
+            batch_size (int): The number of records that are consumed before the loaded elements are converted.
+            max_elements (Optional[int]): The maximum number of nodes and relationships that are loaded. The first
+                record whose elements exceed this number and the remaining records are discarded. By default, the
+                element budget (see `set_element_budget`) is used, or the whole result is loaded if there is none.
+            **kwargs (Dict[str, Any]): Additional parameters that should be passed to the Cypher query.
+
+        Returns:
+            None
+
+        Raises:
+            Exception: If no driver was specified.
+            ValueError: If `batch_size` is not positive.
+        """
+        if self._driver is None:
+            raise Exception("no driver specified")
+        if batch_size < 1:
+            raise ValueError("batch_size must be a positive number")
+        from neo4j.graph import Relationship
+
+        if max_elements is None:
+            max_elements = self._max_elements
+        stats = Neo4jGraphWidget.__new_pipeline_stats(cypher)
+        nodes = {}  # element id -> neo4j node
+        relationships = {}  # element id -> neo4j relationship
+        pending_nodes = []
+        pending_relationships = []
+
+        def collect(values: Any) -> bool:
+            # the new entities of the record, which are only added if all of them fit into max_elements
+            new_nodes = {}
+            new_relationships = {}
+            for entity in Neo4jGraphWidget.__iter_graph_entities(values):
+                if isinstance(entity, Relationship):
+                    if entity.element_id not in relationships:
+                        new_relationships[entity.element_id] = entity
+                elif entity.element_id not in nodes:
+                    new_nodes[entity.element_id] = entity
+            if max_elements is not None and \
+                    len(nodes) + len(relationships) + len(new_nodes) + len(new_relationships) > max_elements:
+                return False
+            nodes.update(new_nodes)
+            relationships.update(new_relationships)
+            pending_nodes.extend(new_nodes.values())
+            pending_relationships.extend(new_relationships.values())
+            return True
+
+        widget = None
+        compact_graph = _CompactGraph(*self.__get_property_projections())
+        # nodes that were only known as relationship endpoints when they were converted
+        stub_nodes = {}
+        shown_count = 0
+        truncated = False
+        from IPython.display import display
+        from ipywidgets import Label
+
+        progress = Label(value="Loading...")
+        display(progress)
+
+        def convert_pending() -> None:
+            with Neo4jGraphWidget.__measure(stats, 'convert'):
+                convert_pending_items()
+
+        def convert_pending_items() -> None:
+            for stub_id in [stub_id for stub_id, (node, _) in stub_nodes.items() if len(node.labels) > 0]:
+                node, row = stub_nodes.pop(stub_id)
+                compact_graph.set_node(row, node)
+            for node in pending_nodes:
+                row = compact_graph.add_node(node)
+                if len(node.labels) == 0 and len(node) == 0:
+                    stub_nodes[node.element_id] = (node, row)
+            for relationship in pending_relationships:
+                compact_graph.add_relationship(relationship)
+            pending_nodes.clear()
+            pending_relationships.clear()
+
+        with self.__open_session() as session:
+            with Neo4jGraphWidget.__measure(stats, 'query'):
+                result = self.__run_cypher(session, cypher, **kwargs)
+            # the stages that are measured while the records are consumed are excluded from the fetch timing
+            fetch_start = time.perf_counter()
+            nested_duration = sum(stats['timings'].values())
+            for index, record in enumerate(result, 1):
+                if not collect(record.values()):
+                    truncated = True
+                    break
+                if index % batch_size == 0:
+                    convert_pending()
+                    loaded_count = compact_graph.node_count + compact_graph.relationship_count
+                    if loaded_count >= 2 * shown_count:
+                        widget = self.__update_streamed_widget(widget, compact_graph, layout, stats)
+                        shown_count = loaded_count
+                    progress.value = (f"Loaded {compact_graph.node_count} nodes and "
+                                      f"{compact_graph.relationship_count} relationships...")
+            if truncated:
+                # discard the remaining records without transferring them
+                result.consume()
+            nested_duration = sum(stats['timings'].values()) - nested_duration
+            stats['timings']['fetch'] += time.perf_counter() - fetch_start - nested_duration
+        convert_pending()
+        widget = self.__update_streamed_widget(widget, compact_graph, layout, stats)
+        progress.value = (f"Loaded {compact_graph.node_count} nodes and {compact_graph.relationship_count} relationships"
+                          + (f" (stopped at the limit of {max_elements} elements)" if truncated else ""))
+        self.__finish_pipeline_stats(stats, widget)
+
+    def __update_streamed_widget(self, widget: Optional["GraphWidget"], compact_graph: _CompactGraph,
+                                 layout: Optional[str], stats: Dict[str, Any]) -> "GraphWidget":
+        """
+        Creates and shows a new widget for the given items, or replaces the items of the already shown `widget`.
+        """
+        is_shown = widget is not None
+        if not is_shown:
+            widget = self.__new_widget()
+
+        # hold the synchronization to send both lists to the frontend at once
+        with widget.hold_sync():
+            nodes, edges = self.__get_configured_items(widget, compact_graph, layout, stats)
+            if is_shown:
+                # mappings are applied by the core widget when it is shown for the first time only
+                with Neo4jGraphWidget.__measure(stats, 'render'):
+                    Neo4jGraphWidget.__apply_core_mappings(widget, nodes, edges, scale_layout=False)
+            else:
+                widget.nodes, widget.edges = nodes, edges
+
+        self.__set_shown_graph(widget, compact_graph)
+        if not is_shown:
+            with Neo4jGraphWidget.__measure(stats, 'render'):
+                widget.show()
+        return widget
+
+    def add_cypher(self, cypher: str, **kwargs: Dict[str, Any]) -> None:
+        """
+        Adds the result of the given Cypher query to the most recently shown widget.
+
+        Only the nodes and relationships that are not yet part of the widget are converted and mapped, the already
+        shown elements and their layout are kept. The added elements use the default binding instead of `ColumnBinding`s,
+        which are evaluated again for all elements by `restyle`. If relationship autocompletion is enabled, the relationships between
+        the nodes of the added result are completed. If no graph was shown yet, the query is shown as new widget.
+
+        Args:
+            cypher (str): The Cypher query whose result should be added to the graph.
+            **kwargs (Dict[str, Any]): Additional parameters that should be passed to the Cypher query.
+
+        Returns:
+            None
+
+        Raises:
+            Exception: If no driver was specified, or the result exceeds the element budget and no sampling is
+                configured (see `set_element_budget`).
+        """
+        if self._driver is None:
+            raise Exception("no driver specified")
+        if self._widget is None or len(self._widget.nodes) == 0:
+            self.show_cypher(cypher, **kwargs)
+            return
+
+        stats = Neo4jGraphWidget.__new_pipeline_stats(cypher)
+        graph = self.__get_graph(stats, cypher, **kwargs)
+        self.__merge_graph(self._widget, self.__get_new_compact_graph(self._widget, graph, stats), stats)
+
+    def expand(self, node_ids: Optional[List[Any]] = None, rel_types: Union[str, list[str], None] = None,
+               limit: Optional[int] = 100) -> None:
+        """
+        Adds the neighborhood of the given nodes to the most recently shown widget.
+
+        Only the relationships of the given nodes that are not yet part of the widget are fetched, together with their
+        other nodes. The already shown elements and their layout are kept. Like with `add_cypher`, the added elements use
+        the default binding instead of `ColumnBinding`s until the graph is restyled.
+
+        Args:
+            node_ids (Optional[List[Any]]): The ids of the widget nodes that should be expanded. By default, the
+                currently selected nodes are expanded (see `get_selected_node_ids`).
+            rel_types (Union[str, list[str], None]): The types of the relationships that should be added. By default,
+                all relationships are added.
+            limit (Optional[int]): The maximum number of added relationships. None to add all relationships.
+
+        Returns:
+            None
+
+        Raises:
+            Exception: If no driver was specified.
+            ValueError: If there are no nodes to expand.
+        """
+        if self._driver is None:
+            raise Exception("no driver specified")
+        if node_ids is None:
+            node_ids = self.get_selected_node_ids()
+        if len(node_ids) == 0:
+            raise ValueError("no nodes to expand, select nodes in the widget or specify their ids")
+        if self._widget is None:
+            raise Exception("no graph shown")
+        if isinstance(rel_types, str):
+            rel_types = [rel_types]
+
+        expanded_ids = set(node_ids)
+        # only fetch the relationships that are not loaded yet, including the parent relationships, which are not shown
+        # as edges
+        loaded_relationship_ids = [edge['id'] for edge in self._widget.edges
+                                   if edge['start'] in expanded_ids or edge['end'] in expanded_ids]
+        loaded_relationship_ids.extend(edge_id for edge_id, (start, end) in self._widget._parent_relationships.items()
+                                       if start in expanded_ids or end in expanded_ids)
+        parameters = {'node_ids': list(expanded_ids), 'loaded_relationship_ids': loaded_relationship_ids}
+        if rel_types is not None:
+            parameters['relationship_types'] = rel_types
+        if limit is not None:
+            parameters['limit'] = limit
+        cypher = Neo4jGraphWidget.__get_expand_cypher(rel_types is not None, limit is not None)
+
+        stats = Neo4jGraphWidget.__new_pipeline_stats(cypher)
+        with self.__open_session() as session:
+            with Neo4jGraphWidget.__measure(stats, 'query'):
+                result = session.run(self.__to_query(cypher), **parameters)
+            with Neo4jGraphWidget.__measure(stats, 'fetch'):
+                graph = result.graph()
+        self.__merge_graph(self._widget, self.__get_new_compact_graph(self._widget, graph, stats), stats)
+
+    @staticmethod
+    def __get_expand_cypher(has_relationship_types: bool, has_limit: bool) -> str:
+        """
+        Returns the query that resolves the relationships of the `$node_ids` parameter (the widget ids, which are the
+        legacy neo4j ids) that are not contained in the `$loaded_relationship_ids` parameter.
+        """
+        reltypes_expr = "AND type(rel) IN $relationship_types" if has_relationship_types else ""
+        limit_expr = "LIMIT $limit" if has_limit else ""
+        return f"""
+            MATCH (n)-[rel]-(m)
+            WHERE id(n) IN $node_ids
+            AND NOT id(rel) IN $loaded_relationship_ids
+            {reltypes_expr}
+            WITH DISTINCT rel, m {limit_expr}
+            RETURN rel, m
+        """
+
+    def expand_collapsed(self, node_ids: Optional[List[Any]] = None) -> None:
+        """
+        Replaces the given collapsed nodes (see `collapse_configuration`) of the most recently shown widget with the
+        nodes that they summarize.
+
+        The relationships between the expanded nodes and the shown nodes are loaded from the database. Their
+        relationships to the remaining collapsed nodes and the relationships of collapsed types are aggregated again.
+
+        Args:
+            node_ids (Optional[List[Any]]): The ids of the collapsed nodes that should be expanded. By default, the
+                currently selected collapsed nodes are expanded (see `get_selected_node_ids`).
+
+        Returns:
+            None
+
+        Raises:
+            Exception: If no driver was specified.
+            ValueError: If there are no collapsed nodes to expand.
+        """
+        if self._driver is None:
+            raise Exception("no driver specified")
+        if node_ids is None:
+            node_ids = self.get_selected_node_ids()
+        collapsed_members = self._collapsed_members
+        summary_ids = [node_id for node_id in node_ids if node_id in collapsed_members]
+        if len(summary_ids) == 0:
+            raise ValueError("no collapsed nodes to expand, select collapsed nodes in the widget or specify their ids")
+
+        member_ids = [member_id for summary_id in summary_ids for member_id in collapsed_members[summary_id]]
+        # the summary node of each node that stays collapsed
+        summaries = {member_id: summary_id for summary_id, members in collapsed_members.items()
+                     if summary_id not in summary_ids for member_id in members}
+        collapse = self.__get_collapse_configurations()
+        collapse_types = [collapse_type for collapse_type, _ in collapse[1]] if collapse is not None else []
+        # the ids of the nodes (and not of the group and summary nodes) of the widget
+        shown_ids = [node['id'] for node in self._widget.nodes if not isinstance(node['id'], str)] + member_ids
+
+        # legacy ids, like the ids of the widget items and the collapsed members (see __get_collapse_cypher)
+        cypher = """
+            MATCH (n) WHERE id(n) IN $member_ids
+            OPTIONAL MATCH (n)-[rel]-(m)
+            WHERE id(m) IN $node_ids
+            AND NOT type(rel) IN $collapse_types
+            RETURN n, rel, m
+        """
+        aggregated_cypher = """
+            MATCH (n)-[rel]-(m)
+            WHERE id(n) IN $member_ids
+            AND (id(m) IN $collapsed_ids OR (type(rel) IN $collapse_types AND id(m) IN $node_ids))
+            RETURN DISTINCT id(rel) AS id, id(startNode(rel)) AS start, type(rel) AS type, id(endNode(rel)) AS end
+        """
+        stats = Neo4jGraphWidget.__new_pipeline_stats(cypher)
+        with self.__open_session() as session:
+            with Neo4jGraphWidget.__measure(stats, 'query'):
+                result = session.run(self.__to_query(cypher), member_ids=member_ids, node_ids=shown_ids,
+                                     collapse_types=collapse_types)
+            with Neo4jGraphWidget.__measure(stats, 'fetch'):
+                graph = result.graph()
+            with Neo4jGraphWidget.__measure(stats, 'query'):
+                result = session.run(self.__to_query(aggregated_cypher), member_ids=member_ids,
+                                     node_ids=shown_ids, collapsed_ids=list(summaries), collapse_types=collapse_types)
+            with Neo4jGraphWidget.__measure(stats, 'fetch'):
+                rows = [record.values() for record in result]
+
+        compact_graph = self.__get_new_compact_graph(self._widget, graph, stats)
+        with Neo4jGraphWidget.__measure(stats, 'convert'):
+            counts = {}
+            for _, start, relationship_type, end in rows:
+                key = (summaries.get(start, start), relationship_type, summaries.get(end, end))
+                counts[key] = counts.get(key, 0) + 1
+            compact_graph.summary_edges.extend(Neo4jGraphWidget.__to_summary_edge(start, relationship_type, end, count, {})
+                                               for (start, relationship_type, end), count in counts.items())
+        self.__merge_graph(self._widget, compact_graph, stats, frozenset(summary_ids))
+
+    def __get_collapse_configurations(self) -> Optional[Tuple[List[Tuple[str, Optional[str], List[Tuple[str, str]]]],
+                                                              List[Tuple[str, List[Tuple[str, str]]]]]]:
+        """
+        Returns the `collapse_configuration`s of the node labels as (label, group_by, aggregations) and of the
+        relationship types as (type, aggregations), or None if there are none.
+
+        Raises:
+            ValueError: If a collapse configuration is invalid.
+        """
+        node_collapses = []
+        for label, configuration in self._node_configurations.items():
+            collapse = configuration.get('collapse_configuration')
+            if label != '*' and collapse is not None and collapse is not False:
+                group_by, aggregations = Neo4jGraphWidget.__parse_collapse_configuration(collapse, label)
+                node_collapses.append((label, group_by, aggregations))
+        relationship_collapses = []
+        for relationship_type, configuration in self._edge_configurations.items():
+            collapse = configuration.get('collapse_configuration')
+            if relationship_type != '*' and collapse is not None and collapse is not False:
+                group_by, aggregations = Neo4jGraphWidget.__parse_collapse_configuration(collapse, relationship_type)
+                if group_by is not None:
+                    raise ValueError(f"the collapse_configuration of '{relationship_type}' cannot group relationships, "
+                                     f"use True or a dict with aggregations")
+                relationship_collapses.append((relationship_type, aggregations))
+        if len(node_collapses) == 0 and len(relationship_collapses) == 0:
+            return None
+        return node_collapses, relationship_collapses
+
+    @staticmethod
+    def __parse_collapse_configuration(collapse: Any, label: str) -> Tuple[Optional[str], List[Tuple[str, str]]]:
+        if collapse is True:
+            return None, []
+        if isinstance(collapse, str):
+            return collapse, []
+        if isinstance(collapse, dict):
+            aggregations = list(collapse.get('aggregations', {}).items())
+            for key, aggregation in aggregations:
+                if aggregation not in COLLAPSE_AGGREGATIONS:
+                    raise ValueError(f"unsupported aggregation '{aggregation}' of '{key}' for '{label}', "
+                                     f"supported aggregations are {sorted(COLLAPSE_AGGREGATIONS)}")
+            return collapse.get('group_by'), aggregations
+        raise ValueError(f"the collapse_configuration of '{label}' must be True, a property key or a dict, "
+                         f"since it is resolved by the database")
+
+    def __get_collapse_query(self, columns: List[str], cypher: str,
+                             collapse: Tuple[List[Tuple[str, Optional[str], List[Tuple[str, str]]]],
+                                             List[Tuple[str, List[Tuple[str, str]]]]],
+                             kwargs: Dict[str, Any]) -> Tuple[Any, Dict[str, Any]]:
+        """
+        Returns the query that collapses the result of the given Cypher query with the given returned columns (see
+        `__get_collapse_cypher`) and all of its parameters, including the given parameters of the Cypher query.
+        """
+        collapse_cypher, parameters = Neo4jGraphWidget.__get_collapse_cypher(
+            columns, cypher, collapse, self._get_relationship_types_expression()
+            if self._is_autocomplete_enabled() else None)
+        return self.__to_query(collapse_cypher), {**kwargs, **parameters, **self.__get_relationship_types_parameters()}
+
+    @staticmethod
+    def __get_collapse_cypher(columns: List[str], cypher: str,
+                              collapse: Tuple[List[Tuple[str, Optional[str], List[Tuple[str, str]]]],
+                                              List[Tuple[str, List[Tuple[str, str]]]]],
+                              autocomplete_reltypes_expr: Optional[str]) -> Tuple[str, Dict[str, Any]]:
+        """
+        Wraps the given Cypher query, so that the database replaces the returned nodes of collapsed labels with a
+        summary per group and the relationships of collapsed nodes and collapsed types with a summary per type and
+        (summarized) start and end node.
+
+        Returns:
+            Tuple[str, Dict[str, Any]]: The wrapped query, which returns the remaining nodes as `n`, the remaining
+            relationships as `rel`, and the summaries as `summary` maps, and its additional parameters.
+        """
+        node_collapses, relationship_collapses = collapse
+        parameters = {
+            '__collapse_labels': [label for label, _, _ in node_collapses],
+            '__collapse_keys': [group_by for _, group_by, _ in node_collapses],
+            '__collapse_types': [relationship_type for relationship_type, _ in relationship_collapses],
+            '__collapse_node_aggregation_keys': [key for _, _, aggregations in node_collapses
+                                                 for key, _ in aggregations],
+            '__collapse_relationship_aggregation_keys': [key for _, aggregations in relationship_collapses
+                                                         for key, _ in aggregations]
+        }
+
+        def group(node: str) -> str:
+            # the index of the first collapse configuration of the node and its group_by value, or NULL
+            return f"""head([__i IN range(0, size($__collapse_labels) - 1)
+                WHERE $__collapse_labels[__i] IN labels({node})
+                | [__i, CASE WHEN $__collapse_keys[__i] IS NULL THEN NULL ELSE {node}[$__collapse_keys[__i]] END]])"""
+
+        node_aggregations = []
+        key_index = 0
+        for index, (_, _, aggregations) in enumerate(node_collapses):
+            for _, aggregation in aggregations:
+                node_aggregations.append(f"{aggregation}(CASE WHEN __group[0] = {index} "
+                                         f"THEN n[$__collapse_node_aggregation_keys[{key_index}]] END)")
+                key_index += 1
+        relationship_aggregations = []
+        key_index = 0
+        for index, (_, aggregations) in enumerate(relationship_collapses):
+            for _, aggregation in aggregations:
+                relationship_aggregations.append(
+                    f"{aggregation}(CASE WHEN type(rel) = $__collapse_types[{index}] "
+                    f"THEN rel[$__collapse_relationship_aggregation_keys[{key_index}]] END)")
+                key_index += 1
+
+        if autocomplete_reltypes_expr is not None:
+            # complete the relationships between the returned nodes like the autocompleted query does
+            relationships = f"""
+                UNWIND __nodes AS n
+                MATCH (n)-[rel]->(m)
+                WHERE m IN __nodes
+                {autocomplete_reltypes_expr}
+                RETURN collect(rel) AS __relationships
+            """
+        else:
+            relationships = """
+                UNWIND __entities AS __entity
+                UNWIND __entity.relationships AS rel
+                RETURN collect(DISTINCT rel) AS __relationships
+            """
+        # the members and the start and end nodes of the summaries are identified by the legacy id(), since the core
+        # widget identifies the shown nodes by their legacy ids (see _CompactGraph), e.g. to merge expanded members
+        return f"""
+            {Neo4jGraphWidget.__get_unwound_items_cypher(cypher, columns)}
+            WITH collect(CASE
+                WHEN __item IS :: NODE THEN {{nodes: [__item], relationships: []}}
+                WHEN __item IS :: RELATIONSHIP
+                    THEN {{nodes: [startNode(__item), endNode(__item)], relationships: [__item]}}
+                WHEN __item IS :: PATH THEN {{nodes: nodes(__item), relationships: relationships(__item)}}
+                ELSE {{nodes: [], relationships: []}}
+            END) AS __entities
+            CALL {{
+                WITH __entities
+                UNWIND __entities AS __entity
+                UNWIND __entity.nodes AS n
+                RETURN collect(DISTINCT n) AS __nodes
+            }}
+            CALL {{
+                WITH __entities, __nodes
+                {relationships}
+            }}
+            CALL {{
+                WITH __nodes
+                UNWIND __nodes AS n
+                WITH n, {group('n')} AS __group
+                WHERE __group IS NULL
+                RETURN n, NULL AS rel, NULL AS summary
+                UNION ALL
+                WITH __nodes
+                UNWIND __nodes AS n
+                WITH n, {group('n')} AS __group
+                WHERE __group IS NOT NULL
+                WITH __group, count(n) AS __count, collect(id(n)) AS __members,
+                    [{", ".join(node_aggregations)}] AS __aggregates
+                RETURN NULL AS n, NULL AS rel,
+                    {{group: __group, count: __count, members: __members, aggregates: __aggregates}} AS summary
+                UNION ALL
+                WITH __relationships
+                UNWIND __relationships AS rel
+                WITH rel, {group('startNode(rel)')} AS __start_group, {group('endNode(rel)')} AS __end_group
+                WHERE __start_group IS NULL AND __end_group IS NULL AND NOT type(rel) IN $__collapse_types
+                RETURN NULL AS n, rel, NULL AS summary
+                UNION ALL
+                WITH __relationships
+                UNWIND __relationships AS rel
+                WITH rel, {group('startNode(rel)')} AS __start_group, {group('endNode(rel)')} AS __end_group
+                WHERE __start_group IS NOT NULL OR __end_group IS NOT NULL OR type(rel) IN $__collapse_types
+                WITH type(rel) AS __type, coalesce(__start_group, id(startNode(rel))) AS __start,
+                    coalesce(__end_group, id(endNode(rel))) AS __end, count(rel) AS __count,
+                    [{", ".join(relationship_aggregations)}] AS __aggregates
+                RETURN NULL AS n, NULL AS rel,
+                    {{type: __type, start: __start, end: __end, count: __count, aggregates: __aggregates}} AS summary
+            }}
+            RETURN n, rel, summary
+        """, parameters
+
+    def __to_collapsed_graph(self, rows: List[List[Any]],
+                             collapse: Tuple[List[Tuple[str, Optional[str], List[Tuple[str, str]]]],
+                                             List[Tuple[str, List[Tuple[str, str]]]]]) -> _CompactGraph:
+        """
+        Converts the rows of the collapsed query (see `__get_collapse_cypher`) into a compact graph with summary items.
+        """
+        node_collapses, relationship_collapses = collapse
+        relationship_aggregations = {relationship_type: aggregations
+                                     for relationship_type, aggregations in relationship_collapses}
+
+        def to_node_id(value: Any) -> Any:
+            # the group of a summary node, or the legacy id of a node
+            if isinstance(value, list):
+                label, group_by, _ = node_collapses[value[0]]
+                return Neo4jGraphWidget.__get_summary_id(label, group_by, value[1])
+            return value
+
+        compact_graph = _CompactGraph(*self.__get_property_projections())
+        for node, relationship, summary in rows:
+            if node is not None:
+                compact_graph.add_node(node)
+            elif relationship is not None:
+                compact_graph.add_relationship(relationship)
+            elif 'type' in summary:
+                aggregations = relationship_aggregations.get(summary['type'], [])
+                compact_graph.summary_edges.append(Neo4jGraphWidget.__to_summary_edge(
+                    to_node_id(summary['start']), summary['type'], to_node_id(summary['end']), summary['count'],
+                    Neo4jGraphWidget.__get_aggregated_properties(aggregations, summary['aggregates'],
+                                                                 relationship_collapses, summary['type'])))
+            else:
+                index, value = summary['group']
+                label, group_by, aggregations = node_collapses[index]
+                summary_id = Neo4jGraphWidget.__get_summary_id(label, group_by, value)
+                properties = {group_by: value} if group_by is not None else {}
+                properties.update(Neo4jGraphWidget.__get_aggregated_properties(aggregations, summary['aggregates'],
+                                                                               node_collapses, label))
+                properties['count'] = summary['count']
+                properties['caption'] = f"{label if group_by is None else value} ({summary['count']})"
+                properties['label'] = label
+                compact_graph.summary_nodes.append({'id': summary_id, 'properties': properties})
+                compact_graph.collapsed_members[summary_id] = array('q', summary['members'])
+        return compact_graph
+
+    @staticmethod
+    def __get_aggregated_properties(aggregations: List[Tuple[str, str]], aggregates: List[Any],
+                                    collapses: List[Tuple], label: str) -> Dict[str, Any]:
+        """
+        Returns the aggregated properties of a summary of the given label from the aggregates of all collapse
+        configurations, which are ordered like the configurations.
+        """
+        offset = 0
+        for collapse in collapses:
+            if collapse[0] == label:
+                break
+            offset += len(collapse[-1])
+        return {f"{aggregation}_{key}": aggregates[offset + index]
+                for index, (key, aggregation) in enumerate(aggregations)}
+
+    @staticmethod
+    def __get_summary_id(label: str, group_by: Optional[str], value: Any) -> str:
+        return f"Collapsed{label}" if group_by is None else f"Collapsed{label}:{value}"
+
+    @staticmethod
+    def __to_summary_edge(start: Any, relationship_type: str, end: Any, count: int,
+                          aggregated_properties: Dict[str, Any]) -> Dict:
+        return {'id': f"Collapsed{start}-{relationship_type}-{end}", 'start': start, 'end': end,
+                'properties': {**aggregated_properties, 'count': count, 'label': relationship_type}}
+
+    def __get_relationship_types_parameters(self) -> Dict[str, Any]:
+        if self._is_autocomplete_enabled() and self._get_relationship_types_expression():
+            return {"relationship_types": self._autocomplete_relationships}
+        return {}
+
+    def __get_new_compact_graph(self, widget: "GraphWidget", graph: Any, stats: Dict[str, Any]) -> _CompactGraph:
+        """
+        Converts the nodes and relationships of the given graph that are not yet part of the given widget.
+        """
+        with Neo4jGraphWidget.__measure(stats, 'convert'):
+            node_ids = {node['id'] for node in widget.nodes}
+            # the converted parent relationships are not part of the widget edges
+            edge_ids = {edge['id'] for edge in widget.edges}.union(widget._parent_relationships)
+            compact_graph = _CompactGraph(*self.__get_property_projections())
+            for node in graph.nodes:
+                if node.id not in node_ids:
+                    compact_graph.add_node(node)
+            for relationship in graph.relationships:
+                if relationship.id not in edge_ids:
+                    compact_graph.add_relationship(relationship)
+        return compact_graph
+
+    def __merge_graph(self, widget: "GraphWidget", compact_graph: _CompactGraph, stats: Dict[str, Any],
+                      removed_node_ids: FrozenSet[Any] = frozenset()) -> None:
+        """
+        Adds the items of the given graph that are not yet part of the given (already shown) widget, and removes the
+        nodes with the given ids and their edges.
+
+        Only the added items are mapped with the mappings that are installed on the widget, except for the nodes whose
+        parent changes due to added parent relationships.
+        """
+        with Neo4jGraphWidget.__measure(stats, 'convert'):
+            node_ids = {node['id'] for node in widget.nodes}
+            edge_ids = {edge['id'] for edge in widget.edges}
+            # the summary items of collapsed nodes are not filtered by the compact graph
+            compact_graph.summary_nodes = [item for item in compact_graph.summary_nodes if item['id'] not in node_ids]
+            compact_graph.summary_edges = [item for item in compact_graph.summary_edges if item['id'] not in edge_ids]
+            node_items, edge_items = compact_graph.to_items()
+        stats['nodes'] = len(node_items)
+        with Neo4jGraphWidget.__measure(stats, 'group'):
+            group_nodes = [group_node for group_node in self.__get_group_nodes(self._node_configurations, node_items)
+                           if group_node['id'] not in node_ids]
+        positions = getattr(widget, '_precomputed_positions', None)
+        if positions is not None and self._layout_cache is not None:
+            with Neo4jGraphWidget.__measure(stats, 'layout'):
+                # the installed position mapping resolves the added nodes from the same dict
+                positions.update(self.__precompute_positions([*node_items, *group_nodes],
+                                                             [*widget.edges, *edge_items], positions))
+        with Neo4jGraphWidget.__measure(stats, 'parent'):
+            edge_items, node_to_parent = self.__install_parent_mapping(widget, edge_items)
+        stats['group_nodes'] = len(group_nodes)
+        stats['relationships'] = len(edge_items)
+
+        with Neo4jGraphWidget.__measure(stats, 'render'):
+            # the mapping functions of the core widget, applied to the added items only
+            mappings = _CoreMappings(widget)
+            nodes = [mappings.map_node(index, dict(node)) if node['id'] in node_to_parent
+                     else node for index, node in enumerate(widget.nodes) if node['id'] not in removed_node_ids]
+            nodes.extend(mappings.map_node(index, node)
+                         for index, node in enumerate([*node_items, *group_nodes], len(nodes)))
+            edges = [edge for edge in widget.edges
+                     if edge['start'] not in removed_node_ids and edge['end'] not in removed_node_ids]
+            edges.extend(mappings.map_edge(index, edge) for index, edge in enumerate(edge_items, len(edges)))
+            # hold the synchronization to send both lists to the frontend at once
+            with widget.hold_sync():
+                widget.nodes = nodes
+                widget.edges = edges
+            mappings.raise_error()
+        if widget is self._widget:
+            self._collapsed_members = {**{summary_id: members for summary_id, members in self._collapsed_members.items()
+                                          if summary_id not in removed_node_ids}, **compact_graph.collapsed_members}
+            if self._compact_graph is not None:
+                self._compact_graph = self._compact_graph.merged(compact_graph, removed_node_ids)
+        self.__finish_pipeline_stats(stats, widget)
+
+    def set_graph_retention(self, enabled: bool = True) -> None:
+        """
+        Sets whether the loaded elements of the shown graphs are kept in their compact form next to the widget items,
+        which `restyle` and `save_snapshot` require. Disabled by default, since the widget items are the only copy of
+        the elements that the widget needs to display and extend the graph.
+
+        Applies to the graphs that are shown afterward.
+
+        Args:
+            enabled (bool): Whether the elements of the shown graphs are kept.
+
+        Returns:
+            None
+        """
+        self._graph_retention = enabled
+
+    def __set_shown_graph(self, widget: "GraphWidget", compact_graph: _CompactGraph) -> None:
+        """
+        Makes the given widget the most recently shown one, and keeps the given graph if the retention is enabled.
+        """
+        self._widget = widget
+        self._compact_graph = compact_graph if self._graph_retention else None
+        # the summary nodes are expanded with their members, which are kept without the graph
+        self._collapsed_members = compact_graph.collapsed_members
+
+    def __get_shown_graph(self) -> _CompactGraph:
+        if self._compact_graph is None:
+            raise Exception("no graph shown" if self._widget is None
+                            else "the shown graph was not retained, call set_graph_retention before showing it")
+        return self._compact_graph
+
+    def restyle(self, layout: Optional[str] = None) -> None:
+        """
+        Applies the current configurations to the most recently shown graph, e.g. after changing a color with
+        `add_node_configuration`, without querying the database or creating a new widget.
+
+        The node, relationship, heat and parent mappings are applied to the already loaded elements, and the node
+        or edge list is only sent to the frontend again if its visual attributes changed.
+
+        Args:
+            layout (Optional[str]): The graph layout, see `show_cypher`. By default, the layout of the shown graph is
+                kept.
+
+        Returns:
+            None
+
+        Raises:
+            Exception: If no graph was shown yet, or it was not retained (see `set_graph_retention`).
+        """
+        compact_graph = self.__get_shown_graph()
+        widget = self._widget
+        if layout is None:
+            graph_layout = widget.get_graph_layout()
+            layout = graph_layout.get('algorithm') if isinstance(graph_layout, dict) else None
+        stats = Neo4jGraphWidget.__new_pipeline_stats(self._pipeline_stats['cypher']
+                                                      if self._pipeline_stats is not None else None)
+        # the new items are only assigned to the widget once they are mapped
+        nodes, edges = self.__get_configured_items(widget, compact_graph, layout, stats)
+        with Neo4jGraphWidget.__measure(stats, 'render'):
+            mappings = _CoreMappings(widget)
+            nodes, edges = mappings.map_items(nodes, edges)
+            mappings.raise_error()
+            # the core widget synchronizes whole lists, so only the changed lists are assigned, and the shown widget
+            # keeps its size
+            changed = {key: items for key, items in (('nodes', nodes), ('edges', edges)) if getattr(widget, key) != items}
+            # the names of the synchronized traits
+            stats['changed'] = [f"_{key}" for key in changed]
+            # hold the synchronization to send both lists to the frontend at once
+            with widget.hold_sync():
+                for key, items in changed.items():
+                    setattr(widget, key, items)
+        self.__finish_pipeline_stats(stats, widget)
+
+    @staticmethod
+    def __with_signature(mapping: Callable[[int, Dict], Any]) -> Callable[[int, Dict], Any]:
+        """
+        Attaches the signature to the given mapping function, since the core widget inspects the signature of each
+        mapping function for every item, which otherwise dominates the time to apply the mappings.
+        """
+        mapping.__signature__ = inspect.signature(mapping)
+        return mapping
+
+    @staticmethod
+    def __apply_core_mappings(widget: "GraphWidget", nodes: List[Dict], edges: List[Dict],
+                              scale_layout: bool = True) -> None:
+        """
+        Maps the given items with the installed mappings and assigns them to the given widget like the core widget
+        does when it is shown, and scales its height to the number of nodes unless `scale_layout` is False.
+        """
+        mappings = _CoreMappings(widget)
+        widget.nodes, widget.edges = mappings.map_items(nodes, edges)
+        if scale_layout:
+            mappings.scale_layout()
+        mappings.raise_error()
+
+    def __get_configured_items(self, widget: "GraphWidget", compact_graph: _CompactGraph, layout: Optional[str],
+                               stats: Dict[str, Any]) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Converts the given graph into new items for the widget, as if the neo4j graph was imported, and installs the
+        configurations as mappings on the widget.
+
+        Returns:
+            Tuple[List[Dict], List[Dict]]: The nodes including the group nodes, and the edges without the parent
+            relationships, which are not yet assigned to the widget.
+        """
+        with Neo4jGraphWidget.__measure(stats, 'convert'):
+            _CoreMappings.mark_neo4j_import(widget)
+            widget.directed = True
+            # new items for each widget, since the mappings modify the item dicts
+            nodes, edges = compact_graph.to_items()
+        return self.__apply_configurations(widget, nodes, edges, layout, stats)
+
+    def __apply_configurations(self, widget: "GraphWidget", nodes: List[Dict], edges: List[Dict],
+                               layout: Optional[str], stats: Dict[str, Any]) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Installs the node, relationship and parent configurations as mappings on the given widget for the given items,
+        and returns the items with the group nodes and without the parent relationships.
+        """
+        stats['nodes'] = len(nodes)
+        with Neo4jGraphWidget.__measure(stats, 'group'):
+            nodes = [*nodes, *self.__get_group_nodes(self._node_configurations, nodes)]
+        with Neo4jGraphWidget.__measure(stats, 'layout'):
+            # the positions of a previous application, e.g. of restyle, are kept
+            positions = getattr(widget, '_precomputed_positions', None)
+            widget._precomputed_positions = self.__precompute_positions(nodes, edges, positions or {}) \
+                if self._layout_cache is not None else None
+        with Neo4jGraphWidget.__measure(stats, 'map'):
+            self.__apply_node_mappings(widget, nodes)
+            self.__apply_edge_mappings(widget, edges)
+            self.__apply_heat_mapping({**self._node_configurations, **self._edge_configurations}, widget, nodes, edges)
+        with Neo4jGraphWidget.__measure(stats, 'parent'):
+            edges, _ = self.__install_parent_mapping(widget, edges)
+        with Neo4jGraphWidget.__measure(stats, 'map'):
+            if layout is None and self._layout_cache is not None:
+                widget.set_graph_layout(self._layout_cache_layout)
+            elif layout is None:
+                widget.set_graph_layout(self._graph_layout)
+            else:
+                widget.set_graph_layout(layout)
+
+            widget.node_cell_mapping = self.node_cell_mapping
+        return nodes, edges
+
+    def get_pipeline_stats(self) -> Optional[Dict[str, Any]]:
+        """
+        Returns the timings and element counts that were recorded for the last shown query.
+
+        The `timings` contain the seconds that were spent in each stage of the pipeline:
+            - "query": Running the Cypher query (and the autocomplete query) until the database accepted it.
+            - "fetch": Consuming the records of the result.
+            - "convert": Converting the neo4j elements into widget items.
+            - "group": Creating the group nodes of the `parent_configuration` bindings.
+            - "layout": Computing the node positions of the layout cache (see `set_layout_cache`).
+            - "parent": Installing the parent relationship mapping.
+            - "map": Installing the node, relationship and heat mappings and the layout.
+            - "render": Applying the mappings and sending the widget to the frontend.
+
+        Returns:
+            Optional[Dict[str, Any]]: The shown `cypher`, whether the result was `cached`, the `timings` of each stage,
+            their `total` and the number of loaded `nodes`, created `group_nodes` and loaded `relationships`, or None
+            if no query was shown yet.
+        """
+        return self._pipeline_stats
+
+    def set_pipeline_stats_callback(self, callback: Optional[Callable[[Dict[str, Any]], None]]) -> None:
+        """
+        Sets a function that is called with the pipeline statistics (see `get_pipeline_stats`) after each shown query,
+        e.g. to collect the timings of a notebook in production. The statistics are logged on the debug level of the
+        `yfiles_jupyter_graphs_for_neo4j.Yfiles_Neo4j_Graphs` logger as well.
+
+        Args:
+            callback (Optional[Callable[[Dict[str, Any]], None]]): The function that receives the statistics, or None
+                to remove the current callback.
+
+        Returns:
+            None
+        """
+        self._pipeline_stats_callback = callback
+
+    @staticmethod
+    def __new_pipeline_stats(cypher: str) -> Dict[str, Any]:
+        return {'cypher': cypher, 'cached': False, 'timings': dict.fromkeys(PIPELINE_STAGES, 0.0)}
+
+    @staticmethod
+    @contextmanager
+    def __measure(stats: Dict[str, Any], stage: str) -> Iterator[None]:
+        """
+        Adds the time spent in the with-block to the timing of the given pipeline stage.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            stats['timings'][stage] += time.perf_counter() - start
+
+    def __finish_pipeline_stats(self, stats: Dict[str, Any], widget: "GraphWidget") -> None:
+        """
+        Completes the given pipeline statistics with the element counts of the widget and publishes them.
+        """
+        stats['total'] = sum(stats['timings'].values())
+        if 'relationships' not in stats:
+            # the nodes were counted before the group nodes were added
+            stats['group_nodes'] = len(widget.nodes) - stats['nodes']
+            stats['relationships'] = len(widget.edges)
+        self._pipeline_stats = stats
+        logger.debug("showed %d nodes, %d group nodes and %d relationships in %.3fs (%s)", stats['nodes'],
+                     stats['group_nodes'], stats['relationships'], stats['total'],
+                     ", ".join(f"{stage}: {duration:.3f}s" for stage, duration in stats['timings'].items()))
+        if self._pipeline_stats_callback is not None:
+            self._pipeline_stats_callback(stats)
+
+    def __run_cypher(self, session: Any, cypher: str, **kwargs: Dict[str, Any]) -> Any:
+        """
+        Runs the given Cypher query in the given session, or its autocompleted variant if relationship autocompletion
+        is enabled.
+
+        Returns:
+            neo4j.Result: The result of the query, which must be consumed before the session is closed.
+        """
+        if self._is_autocomplete_enabled():
+            return self.__run_autocompleted_cypher(session, cypher, **kwargs)
+        return session.run(self.__to_query(cypher), **kwargs)
+
+    def __run_autocompleted_cypher(self, session: Any, cypher: str, **kwargs: Dict[str, Any]) -> Any:
+        """
+        Resolves the given Cypher query and completes the relationships between all returned nodes.
+
+        The query is wrapped in a CALL subquery so that the nodes are collected on the server and only fetched once
+        together with the missing relationships. If the query cannot be wrapped (e.g. because the database does not
+        support the required Cypher features), the two-step approach that sends the node ids back to the database is
+        used instead, which consumes the result of the given query within the element budget. The wrapping is not
+        attempted again for the driver once the database rejected it.
 
-# TODO maybe change to get dynamically when adding bindings
+        Args:
+            session (neo4j.Session): The session in which the queries are run.
+            cypher (str): The Cypher query whose result should be completed.
+            **kwargs (Dict[str, Any]): Additional parameters that should be passed to the Cypher query.
 
-POSSIBLE_NODE_BINDINGS = {'coordinate', 'color', 'size', 'type', 'styles', 'scale_factor', 'position',
-                          'layout', 'property', 'label'}
-POSSIBLE_EDGE_BINDINGS = {'color', 'thickness_factor', 'styles', 'property', 'label'}
-NEO4J_LABEL_KEYS = ['name', 'title', 'text', 'description', 'caption', 'label']
+        Returns:
+            neo4j.Result: The result containing the returned nodes and the relationships between them.
 
-class Neo4jGraphWidget:
-    """
-    A yFiles Graphs for Jupyter widget that is tailored to visualize Cypher queries resolved against a Neo4j database.
-    """
+        Raises:
+            Exception: If the fallback is used and the result of the given query exceeds the element budget.
+        """
+        from neo4j.exceptions import ClientError
+
+        reltypes_expr = self._get_relationship_types_expression()
+        reltypes_params = {"relationship_types": self._autocomplete_relationships} if reltypes_expr else {}
+        columns = []
+        if self._wrapped_autocomplete_supported:
+            try:
+                # EXPLAIN only plans the query, which is enough to know the returned columns
+                explain_result = session.run(f"EXPLAIN {cypher}", **kwargs)
+                columns = explain_result.keys()
+                explain_result.consume()
+            except ClientError:
+                pass
+        if len(columns) > 0:
+            try:
+                result = session.run(self.__to_query(Neo4jGraphWidget.__get_wrapped_autocomplete_cypher(
+                    cypher, columns, reltypes_expr)), **kwargs, **reltypes_params)
+                # wait for the query to be accepted, so that unsupported queries still use the fallback
+                result.keys()
+                return result
+            except ClientError:
+                # the planned query is valid, so the database does not support the wrapping
+                self._wrapped_autocomplete_supported = False
 
-    # noinspection PyShadowingBuiltins
-    def __init__(self, driver: Optional[Any] = None, widget_layout: Optional[Any] = None,
-                 overview_enabled: Optional[bool] = None, context_start_with: Optional[str] = None,
-                 license: Optional[Dict] = None,
-                 autocomplete_relationships: Optional[bool] = False, layout: Optional[str] = 'organic'):
+        node_ids = self.__get_fallback_node_ids(self.__get_budgeted_graph(session.run(self.__to_query(cypher), **kwargs)))
+        return session.run(self.__to_query(Neo4jGraphWidget.__get_node_ids_autocomplete_cypher(reltypes_expr)),
+                           node_ids=node_ids, **reltypes_params)
+
+    async def __get_autocompleted_graph_async(self, session: Any, cypher: str, **kwargs: Dict[str, Any]) -> Any:
         """
-        Initializes a new instance of the Neo4jGraphWidget class.
+        The asynchronous variant of `__run_autocompleted_cypher` for the given async session.
+
+        Returns:
+            Optional[neo4j.graph.Graph]: The graph containing the returned nodes and the relationships between them,
+            or None if the result exceeds the element budget and should be sampled instead.
+        """
+        from neo4j.exceptions import ClientError
+
+        reltypes_expr = self._get_relationship_types_expression()
+        reltypes_params = {"relationship_types": self._autocomplete_relationships} if reltypes_expr else {}
+        columns = []
+        if self._wrapped_autocomplete_supported:
+            try:
+                explain_result = await session.run(f"EXPLAIN {cypher}", **kwargs)
+                columns = explain_result.keys()
+                await explain_result.consume()
+            except ClientError:
+                pass
+        if len(columns) > 0:
+            try:
+                result = await session.run(self.__to_query(Neo4jGraphWidget.__get_wrapped_autocomplete_cypher(
+                    cypher, columns, reltypes_expr)), **kwargs, **reltypes_params)
+            except ClientError:
+                self._wrapped_autocomplete_supported = False
+            else:
+                return await self.__get_budgeted_graph_async(result)
+
+        result = await session.run(self.__to_query(cypher), **kwargs)
+        node_ids = self.__get_fallback_node_ids(await self.__get_budgeted_graph_async(result))
+        result = await session.run(self.__to_query(Neo4jGraphWidget.__get_node_ids_autocomplete_cypher(reltypes_expr)),
+                                   node_ids=node_ids, **reltypes_params)
+        return await self.__get_budgeted_graph_async(result)
+
+    def __get_fallback_node_ids(self, graph: Optional[Any]) -> List[str]:
+        """
+        Returns the element ids of the nodes of the given budgeted graph, which the fallback of the autocompletion
+        completes.
+
+        Raises:
+            Exception: If the graph exceeded the element budget, since the sampling requires the CALL subqueries that
+                the fallback avoids.
+        """
+        if graph is None:
+            raise Exception(f"the query result exceeds the element budget of {self._max_elements} elements and cannot "
+                            f"be sampled by this database, use a more specific query")
+        return [node.element_id for node in graph.nodes]
+
+    @staticmethod
+    def __get_node_ids_autocomplete_cypher(reltypes_expr: str) -> str:
+        """
+        Returns the query that resolves the nodes of the `$node_ids` parameter and the relationships between them.
+        """
+        return f"""
+            MATCH (n) WHERE elementId(n) IN $node_ids
+            RETURN n as start, NULL as rel, NULL as end
+            UNION ALL
+            MATCH (n)-[rel]-(m)
+            WHERE elementId(n) IN $node_ids
+            AND elementId(m) IN $node_ids
+            {reltypes_expr}
+            RETURN n as start, rel, m as end
+        """
+
+    @staticmethod
+    def __get_unwound_items_cypher(cypher: str, columns: List[str]) -> str:
+        """
+        Returns the beginning of a query that wraps the given Cypher query and unwinds the values of its returned
+        columns into rows of `__item`. The elements of lists and the values of maps are unwound up to
+        CYPHER_NESTING_DEPTH levels, like the driver hydrates the nodes and relationships in nested values.
+        """
+        escaped_columns = ", ".join("`" + column.replace("`", "``") + "`" for column in columns)
+        unwinds = []
+        value = "__value"
+        for depth in range(1, CYPHER_NESTING_DEPTH + 1):
+            item = "__item" if depth == CYPHER_NESTING_DEPTH else f"__value{depth}"
+            unwinds.append(f"""
+            UNWIND CASE
+                WHEN {value} IS :: NODE OR {value} IS :: RELATIONSHIP OR {value} IS :: PATH THEN [{value}]
+                WHEN {value} IS :: LIST<ANY> THEN {value}
+                WHEN {value} IS :: MAP THEN [__key IN keys({value}) | {value}[__key]]
+                ELSE [{value}]
+            END AS {item}""")
+            value = item
+        return f"""
+            CALL {{
+                {cypher}
+            }}
+            UNWIND [{escaped_columns}] AS __value""" + "".join(unwinds)
+
+    @staticmethod
+    def __get_wrapped_autocomplete_cypher(cypher: str, columns: List[str], reltypes_expr: str) -> str:
+        """
+        Wraps the given Cypher query, so that all nodes of the returned columns (including the nodes of returned
+        relationships, paths, lists and maps) are collected and returned with the relationships between them.
+        """
+        return f"""
+            {Neo4jGraphWidget.__get_unwound_items_cypher(cypher, columns)}
+            UNWIND CASE
+                WHEN __item IS :: NODE THEN [__item]
+                WHEN __item IS :: RELATIONSHIP THEN [startNode(__item), endNode(__item)]
+                WHEN __item IS :: PATH THEN nodes(__item)
+                ELSE []
+            END AS __node
+            WITH collect(DISTINCT __node) AS __nodes
+            UNWIND __nodes AS n
+            OPTIONAL MATCH (n)-[rel]->(m)
+            WHERE m IN __nodes
+            {reltypes_expr}
+            RETURN n as start, rel, m as end
+        """
+
+    def save_snapshot(self, path: str) -> None:
+        """
+        Saves the graph of the most recently shown widget, including the elements that were added with `add_cypher`
+        or `expand`, together with the configurations, the graph layout and the node positions of the layout cache
+        (see `set_layout_cache`) to the given file.
+
+        The snapshot stores the converted elements in a compact binary format, so that `show_snapshot` neither needs
+        the database nor converts the elements again. Configuration bindings that are functions (or `ColumnBinding`s)
+        cannot be saved and are skipped with a warning.
 
         Args:
-            driver (Optional[neo4j._sync.driver.Neo4jDriver]): The Neo4j driver to resolve the Cypher queries.
-            widget_layout (Optional[ipywidgets.Layout]): Can be used to specify general widget appearance through css attributes.
-                See ipywidgets documentation for the available keywords.
-            overview_enabled (Optional[bool]): Whether the graph overview is enabled or not.
-            context_start_with (Optional[str]): Start with a specific side-panel opened in the interactive widget. Starts with closed side-panel by default.
-            license (Optional[Dict]): The widget works on common public domains without a specific license.
-                For unknown domains, a license can be obtained by the creators of the widget.
-            autocomplete_relationships (Optional[bool]): Whether missing relationships in the Cypher's return value are automatically added.
-            layout (Optional[str]): Specifies the default automatic graph arrangement. Can be overwritten for each
-                cypher separately. By default, an "organic" layout is used. Supported values are:
-                    - "circular"
-                    - "circular_straight_line"
-                    - "hierarchic"
-                    - "organic"
-                    - "interactive_organic"
-                    - "orthogonal"
-                    - "radial"
-                    - "tree"
-                    - "map"
-                    - "orthogonal_edge_router"
-                    - "organic_edge_router"
+            path (str): The path of the snapshot file.
+
+        Returns:
+            None
+
+        Raises:
+            Exception: If no graph was shown yet, or it was not retained (see `set_graph_retention`).
+            ValueError: If a property value cannot be saved, e.g. a neo4j duration. Byte arrays, dates and date times
+                are supported.
+        """
+        compact_graph = self.__get_shown_graph()
+        graph_layout = self._widget.get_graph_layout()
+        positions = getattr(self._widget, '_precomputed_positions', None)
+        metadata = {
+            'node_configurations': Neo4jGraphWidget.__to_snapshot_configurations(self._node_configurations),
+            'relationship_configurations': Neo4jGraphWidget.__to_snapshot_configurations(self._edge_configurations),
+            'parent_configurations': self._parent_configurations,
+            'node_cell_mapping': self.node_cell_mapping if isinstance(self.node_cell_mapping, str) else None,
+            'layout': graph_layout.get('algorithm') if isinstance(graph_layout, dict) else None,
+            'positions': [[node_id, x, y] for node_id, (x, y) in positions.items()] if positions is not None else None
+        }
+        compact_graph.save(path, metadata)
+
+    def show_snapshot(self, path: str, layout: Optional[str] = None, restore_configurations: bool = True) -> None:
         """
+        Displays a graph that was saved with `save_snapshot`, without querying the database.
 
-        self._widget = GraphWidget()
-        self._driver = driver
-        self._session = driver.session()
-        self._license = license
-        self._overview = overview_enabled
-        self._layout = widget_layout
-        self._context_start_with = context_start_with
-        self.set_autocomplete_relationships(autocomplete_relationships)
-        self._graph_layout = layout
+        Args:
+            path (str): The path of the snapshot file.
+            layout (Optional[str]): The graph layout for this request. By default, the saved graph layout is used, or
+                the default layout if the snapshot contains node positions but the layout cache is disabled.
+            restore_configurations (bool): Whether the saved node, relationship and parent configurations replace the
+                current configurations. Otherwise, the current configurations are applied.
 
-        self._node_configurations = {}
-        self._edge_configurations = {}
-        self._parent_configurations = set()
+        Returns:
+            None
 
-    def set_driver(self, driver: Any) -> None:
+        Raises:
+            ValueError: If the file is not a snapshot of this version.
+        """
+        stats = Neo4jGraphWidget.__new_pipeline_stats(path)
+        widget = self.__new_widget()
+        with Neo4jGraphWidget.__measure(stats, 'fetch'):
+            compact_graph, metadata = _CompactGraph.load(path)
+        if restore_configurations:
+            self._node_configurations = metadata['node_configurations']
+            self._edge_configurations = metadata['relationship_configurations']
+            self._parent_configurations = metadata['parent_configurations']
+            if metadata['node_cell_mapping'] is not None:
+                self.set_node_cell_mapping(metadata['node_cell_mapping'])
+        positions = metadata.get('positions')
+        if positions is not None and self._layout_cache is not None:
+            widget._precomputed_positions = {node_id: (x, y) for node_id, x, y in positions}
+        elif positions is not None and layout is None:
+            # the saved layout only keeps the positions, which are not applied without the layout cache
+            layout = self._graph_layout
+        widget.nodes, widget.edges = self.__get_configured_items(widget, compact_graph, layout or metadata['layout'],
+                                                                 stats)
+
+        self.__set_shown_graph(widget, compact_graph)
+        with Neo4jGraphWidget.__measure(stats, 'render'):
+            widget.show()
+        self.__finish_pipeline_stats(stats, widget)
+
+    @staticmethod
+    def __to_snapshot_configurations(configurations: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns the configurations without the bindings that cannot be saved as JSON.
+        """
+        def is_serializable(value: Any) -> bool:
+            if value is None or isinstance(value, (str, int, float, bool)):
+                return True
+            if isinstance(value, (list, tuple)):
+                return all(is_serializable(item) for item in value)
+            if isinstance(value, dict):
+                return all(isinstance(key, str) and is_serializable(item) for key, item in value.items())
+            return False
+
+        def to_json(value: Any) -> Any:
+            # tuples are constants for the core widget, e.g. sizes, while lists are not
+            if isinstance(value, tuple):
+                return {'$tuple': [to_json(item) for item in value]}
+            if isinstance(value, list):
+                return [to_json(item) for item in value]
+            if isinstance(value, dict):
+                return {key: to_json(item) for key, item in value.items()}
+            return value
+
+        saved_configurations = {}
+        for label, configuration in configurations.items():
+            saved_configurations[label] = {}
+            for binding_key, binding in configuration.items():
+                if is_serializable(binding):
+                    saved_configurations[label][binding_key] = to_json(binding)
+                else:
+                    logger.warning("the '%s' binding of '%s' is not saved in the snapshot", binding_key, label)
+        return saved_configurations
+
+    def set_property_projection(self, additional_keys: Optional[List[str]] = None) -> None:
         """
-        The Neo4j driver that is used to resolve the Cypher queries. A new session is created when set.
+        Enables the property projection, which drops the properties that are not needed by the configurations while
+        the query results are converted, so that large unused properties (e.g. embeddings) are not sent to the
+        frontend.
+
+        The kept properties of a node label or relationship type are the properties that are referenced by name in its
+        configuration (or the "*" configuration if it has none) or the node cell mapping, and the properties whose
+        lowercase key is one of NEO4J_LABEL_KEYS. All properties are kept for labels and types whose configuration
+        uses a function binding, since the accessed properties are unknown. Note that the projected properties are not
+        shown in the data panel of the widget either.
 
         Args:
-            driver (neo4j._sync.driver.Neo4jDriver): The Neo4j driver to resolve the Cypher queries.
+            additional_keys (Optional[List[str]]): Property keys that should be kept in any case, e.g. for the data panel.
 
         Returns:
             None
         """
-        self._driver = driver
-        self._session = driver.session()
+        self._projection_keys = frozenset(additional_keys) if additional_keys is not None else frozenset()
 
-    def get_driver(self) -> Any:
+    def del_property_projection(self) -> None:
         """
-        Gets the configured Neo4j driver.
+        Disables the property projection, so that all properties are loaded again.
 
         Returns:
-            neo4j._sync.driver.Neo4jDriver
+            None
         """
-        return self._driver
+        self._projection_keys = None
 
-    def set_autocomplete_relationships(self, autocomplete_relationships: Union[bool, str, list[str]]) -> None:
+    def __get_property_projections(self) -> Tuple[Optional[Dict[str, Optional[FrozenSet[str]]]],
+                                                  Optional[Dict[str, Optional[FrozenSet[str]]]]]:
         """
-        Sets the flag to enable or disable autocomplete for relationships.
-        When autocomplete is enabled, relationships are automatically completed in the graph,
-        similar to the behavior in Neo4j Browser.
-        This can be set to True/False to enable or disable for all relationships,
-        or a single relationship type or a list of relationship types to enable for specific relationships.
+        Returns the kept property keys per node label and per relationship type (see `_CompactGraph`), or None for both
+        if the property projection is disabled.
+        """
+        if self._projection_keys is None:
+            return None, None
+        node_keys = self._projection_keys
+        node_cell_mapping = self.node_cell_mapping
+        if callable(node_cell_mapping):
+            node_keys = None
+        elif isinstance(node_cell_mapping, str):
+            node_keys = node_keys | {node_cell_mapping}
+        return (Neo4jGraphWidget.__get_property_projection(self._node_configurations, node_keys),
+                Neo4jGraphWidget.__get_property_projection(self._edge_configurations, self._projection_keys))
+
+    @staticmethod
+    def __get_property_projection(configurations: Dict[str, Dict[str, Any]],
+                                  keys: Optional[FrozenSet[str]]) -> Dict[str, Optional[FrozenSet[str]]]:
+        projection = {'*': keys}
+        for label, configuration in configurations.items():
+            bound_keys = keys
+            for binding in configuration.values():
+                if bound_keys is None:
+                    break
+                if callable(binding):
+                    bound_keys = None
+                elif isinstance(binding, ColumnBinding):
+                    bound_keys = bound_keys | {binding.property}
+                elif isinstance(binding, str):
+                    # property name or constant value, which does not hurt as key
+                    bound_keys = bound_keys | {binding}
+            projection[label] = bound_keys
+        return projection
+
+    def set_result_cache(self, max_size: int = 32, ttl: Optional[float] = None) -> None:
+        """
+        Enables caching of the query results of `show_cypher`. A cached result is used when the same Cypher query is
+        shown again with the same parameters and autocomplete settings, so that only the configurations are applied
+        again without querying the database. Already cached results are kept if the cache was enabled before.
 
         Args:
-            autocomplete_relationships (Union[bool, str, list[str]]): Enable autocompletion for relationships
-                in general, or for a single type, or for multiple types.
+            max_size (int): The maximum number of cached results. The least recently used result is evicted first.
+            ttl (Optional[float]): The number of seconds after which a cached result expires. Does not expire by default.
 
         Returns:
             None
+
+        Raises:
+            ValueError: If `max_size` is not positive.
         """
-        if not isinstance(autocomplete_relationships, (bool, str, list)):
-            raise ValueError("autocomplete_relationships must be a bool, a string, or a list of strings")
-        if isinstance(autocomplete_relationships, str):
-            self._autocomplete_relationships = [autocomplete_relationships]
+        if max_size < 1:
+            raise ValueError("max_size must be a positive number")
+        if self._result_cache is None:
+            self._result_cache = OrderedDict()
+        self._result_cache_max_size = max_size
+        self._result_cache_ttl = ttl
+        while len(self._result_cache) > max_size:
+            self._result_cache.popitem(last=False)
+            self._result_cache_stats['evictions'] += 1
+
+    def del_result_cache(self) -> None:
+        """
+        Disables the result cache and drops all cached results.
+
+        Returns:
+            None
+        """
+        self._result_cache = None
+
+    def clear_result_cache(self, cypher: Optional[str] = None) -> None:
+        """
+        Drops the cached results, e.g. after the database content changed.
+
+        Args:
+            cypher (Optional[str]): Only drop the cached results of this Cypher query. By default, all results are dropped.
+
+        Returns:
+            None
+        """
+        if self._result_cache is None:
+            return
+        if cypher is None:
+            self._result_cache.clear()
         else:
-            self._autocomplete_relationships = autocomplete_relationships
+            for key in [key for key in self._result_cache if key[0] == cypher]:
+                del self._result_cache[key]
 
-    def _is_autocomplete_enabled(self) -> bool:
-        if isinstance(self._autocomplete_relationships, bool):
-            return self._autocomplete_relationships
-        return len(self._autocomplete_relationships) > 0
+    def get_result_cache_stats(self) -> Dict[str, int]:
+        """
+        Returns the statistics of the result cache.
 
-    def _get_relationship_types_expression(self) -> str:
-        if isinstance(self._autocomplete_relationships, list) and len(self._autocomplete_relationships) > 0:
-            return "AND type(rel) IN $relationship_types"
-        return ""
+        Returns:
+            Dict[str, int]: The number of cache `hits`, `misses` and `evictions` and the current `size` of the cache.
+        """
+        size = len(self._result_cache) if self._result_cache is not None else 0
+        return {**self._result_cache_stats, 'size': size}
+
+    def __get_result_cache_key(self, cypher: str, kwargs: Dict[str, Any]) -> Any:
+        autocomplete_relationships = self._autocomplete_relationships
+        if isinstance(autocomplete_relationships, list):
+            autocomplete_relationships = tuple(autocomplete_relationships)
+        return (cypher, Neo4jGraphWidget.__to_hashable(kwargs), autocomplete_relationships,
+                self._session_configuration.get('database'), self._max_elements, self._sampling,
+                Neo4jGraphWidget.__to_hashable(self.__get_property_projections()),
+                Neo4jGraphWidget.__to_hashable(self.__get_collapse_configurations()))
 
-    def show_cypher(self, cypher: str, layout: Optional[str] = None, **kwargs: Dict[str, Any]) -> None:
+    @staticmethod
+    def __to_hashable(value: Any) -> Any:
+        if isinstance(value, dict):
+            return tuple(sorted((key, Neo4jGraphWidget.__to_hashable(item)) for key, item in value.items()))
+        if isinstance(value, (list, tuple)):
+            return tuple(Neo4jGraphWidget.__to_hashable(item) for item in value)
+        if isinstance(value, (set, frozenset)):
+            return frozenset(Neo4jGraphWidget.__to_hashable(item) for item in value)
+        return value
+
+    def __get_cached_result(self, cypher: str, kwargs: Dict[str, Any]) -> Optional[_CompactGraph]:
+        if self._result_cache is None:
+            return None
+        key = self.__get_result_cache_key(cypher, kwargs)
+        entry = self._result_cache.get(key)
+        if entry is not None and self._result_cache_ttl is not None \
+                and time.monotonic() - entry[0] > self._result_cache_ttl:
+            del self._result_cache[key]
+            entry = None
+        if entry is None:
+            self._result_cache_stats['misses'] += 1
+            return None
+        self._result_cache.move_to_end(key)
+        self._result_cache_stats['hits'] += 1
+        return entry[1]
+
+    def __store_cached_result(self, cypher: str, kwargs: Dict[str, Any], compact_graph: _CompactGraph) -> None:
+        if self._result_cache is None:
+            return
+        self._result_cache[self.__get_result_cache_key(cypher, kwargs)] = (time.monotonic(), compact_graph)
+        while len(self._result_cache) > self._result_cache_max_size:
+            self._result_cache.popitem(last=False)
+            self._result_cache_stats['evictions'] += 1
+
+    def set_layout_cache(self,
+                         layout_function: Optional[Callable[[List[Dict], List[Dict], Dict[Any, Tuple[float, float]]],
+                                                         Dict[Any, Tuple[float, float]]]] = None,
+                         max_size: int = 1000000, layout: Optional[str] = 'no_layout') -> None:
         """
-        Displays the given Cypher query as interactive graph.
+        Enables the computation of the node positions in Python instead of the frontend. The positions are cached per
+        node id and reused whenever the node is shown again, so that the same or an overlapping result is shown at the
+        same positions without running a layout algorithm on each render. Only the nodes without a cached position
+        are placed by the layout function. Already cached positions are kept if the cache was enabled before.
+
+        The positions are passed to the frontend with the node `position` binding, so nodes whose position is
+        configured with a `position` binding keep it.
 
         Args:
-            cypher (str): The Cypher query whose result should be visualized as graph.
-            layout (Optional[str]): The graph layout for this request. Overwrites the general default `layout` that was
-                specified when initializing the class. Supported values are:
-                    - "circular"
-                    - "circular_straight_line"
-                    - "hierarchic"
-                    - "organic"
-                    - "interactive_organic"
-                    - "orthogonal"
-                    - "radial"
-                    - "tree"
-                    - "map"
-                    - "orthogonal_edge_router"
-                    - "organic_edge_router"
-            **kwargs (Dict[str, Any]): Additional parameters that should be passed to the Cypher query.
+            layout_function (Optional[Callable]): A function that receives the node items that have to be placed,
+                all relationship items of the graph and the positions of the already placed nodes by node id, and
+                returns the (x, y) positions of the given nodes by node id. The node items contain the resolved
+                `node_cell` of the node cell mapping, if one is specified. By default, each node is placed close to an
+                already placed neighbor, or into its cell.
+            max_size (int): The maximum number of cached positions. The least recently shown node is evicted first.
+            layout (Optional[str]): The graph layout that the frontend applies to the given positions, if no layout is
+                specified for a request. By default, the positions are kept as they are ("no_layout"). An edge router,
+                e.g. "orthogonal_edge_router", only routes the relationships between the given positions.
 
         Returns:
             None
 
         Raises:
-            Exception: If no driver was specified.
+            ValueError: If `max_size` is not positive.
         """
-        if self._driver is not None:
-            if self._is_autocomplete_enabled():
-                nodes = self._session.run(cypher, **kwargs).graph().nodes
-                node_ids = [node.element_id for node in nodes]
-                reltypes_expr = self._get_relationship_types_expression()
-                cypher = f"""
-                    MATCH (n) WHERE elementId(n) IN $node_ids
-                    RETURN n as start, NULL as rel, NULL as end
-                    UNION ALL
-                    MATCH (n)-[rel]-(m)
-                    WHERE elementId(n) IN $node_ids
-                    AND elementId(m) IN $node_ids
-                    {reltypes_expr}
-                    RETURN n as start, rel, m as end
-                """
-                kwargs = {"node_ids": node_ids}
-                if reltypes_expr:
-                    kwargs["relationship_types"] = self._autocomplete_relationships
-            widget = GraphWidget(overview_enabled=self._overview, context_start_with=self._context_start_with,
-                                 widget_layout=self._layout, license=self._license,
-                                 graph=self._session.run(cypher, **kwargs).graph())
-            self.__create_group_nodes(self._node_configurations, widget)
-            self.__apply_node_mappings(widget)
-            self.__apply_edge_mappings(widget)
-            self.__apply_heat_mapping({**self._node_configurations, **self._edge_configurations}, widget)
-            self.__apply_parent_mapping(widget)
-            if layout is None:
-                widget.set_graph_layout(self._graph_layout)
-            else:
-                widget.set_graph_layout(layout)
+        if max_size < 1:
+            raise ValueError("max_size must be a positive number")
+        if self._layout_cache is None:
+            self._layout_cache = OrderedDict()
+        self._layout_cache_max_size = max_size
+        self._layout_cache_layout = layout
+        self._layout_function = layout_function
+        while len(self._layout_cache) > max_size:
+            self._layout_cache.popitem(last=False)
+            self._layout_cache_stats['evictions'] += 1
+
+    def del_layout_cache(self) -> None:
+        """
+        Disables the layout cache and drops all cached positions, so that the frontend arranges the graphs again.
 
-            widget.node_cell_mapping = self.node_cell_mapping
+        Returns:
+            None
+        """
+        self._layout_cache = None
 
-            self._widget = widget
-            widget.show()
+    def clear_layout_cache(self, node_ids: Optional[List[Any]] = None) -> None:
+        """
+        Drops cached positions, so that the nodes are placed again when they are shown the next time.
+
+        Args:
+            node_ids (Optional[List[Any]]): Only drop the positions of these nodes. By default, all positions are
+                dropped.
+
+        Returns:
+            None
+        """
+        if self._layout_cache is None:
+            return
+        if node_ids is None:
+            self._layout_cache.clear()
         else:
-            raise Exception("no driver specified")
+            for node_id in node_ids:
+                self._layout_cache.pop(node_id, None)
+
+    def get_layout_cache_stats(self) -> Dict[str, int]:
+        """
+        Returns the statistics of the layout cache.
+
+        Returns:
+            Dict[str, int]: The number of shown nodes with a cached position (`hits`), placed nodes (`misses`),
+            `evictions` and the current `size` of the cache.
+        """
+        size = len(self._layout_cache) if self._layout_cache is not None else 0
+        return {**self._layout_cache_stats, 'size': size}
+
+    def __precompute_positions(self, nodes: List[Dict], edges: List[Dict],
+                               positions: Dict[Any, Tuple[float, float]]) -> Dict[Any, Tuple[float, float]]:
+        """
+        Returns the positions of the given nodes from the given positions or the layout cache, and places the
+        remaining nodes with the layout function.
+        """
+        node_positions = {}
+        missing = []
+        for node in nodes:
+            position = positions.get(node['id'])
+            if position is None:
+                position = self._layout_cache.get(node['id'])
+            if position is None:
+                missing.append(node)
+            else:
+                node_positions[node['id']] = position
+        self._layout_cache_stats['hits'] += len(node_positions)
+        self._layout_cache_stats['misses'] += len(missing)
+
+        if len(missing) > 0:
+            node_cell_mapping = self.node_cell_mapping
+            if isinstance(node_cell_mapping, str):
+                missing = [{**node, 'node_cell': node['properties'].get(node_cell_mapping)} for node in missing]
+            elif callable(node_cell_mapping):
+                node_cell_mapping = Neo4jGraphWidget.__to_indexed_mapping(node_cell_mapping)
+                missing = [{**node, 'node_cell': node_cell_mapping(index, node)} for index, node in enumerate(missing)]
+            layout_function = self._layout_function or Neo4jGraphWidget.__place_nodes
+            placed = layout_function(missing, edges, {**positions, **node_positions})
+            missing_ids = {node['id'] for node in missing}
+            node_positions.update((node_id, (float(position[0]), float(position[1])))
+                                  for node_id, position in placed.items() if node_id in missing_ids)
+
+        for node_id, position in node_positions.items():
+            self._layout_cache[node_id] = position
+            self._layout_cache.move_to_end(node_id)
+        while len(self._layout_cache) > self._layout_cache_max_size:
+            self._layout_cache.popitem(last=False)
+            self._layout_cache_stats['evictions'] += 1
+        return node_positions
 
     @staticmethod
-    def __get_neo4j_item_text(element: Dict) -> Union[str, None]:
-        lowercase_element_props = {key.lower(): value for key, value in element.get('properties', {}).items()}
-        for key in NEO4J_LABEL_KEYS:
-            if key in lowercase_element_props:
-                return str(lowercase_element_props[key])
-        return None
+    def __place_nodes(nodes: List[Dict], edges: List[Dict],
+                      positions: Dict[Any, Tuple[float, float]]) -> Dict[Any, Tuple[float, float]]:
+        """
+        The default layout function of the layout cache, which runs in linear time.
+
+        Nodes with a `node_cell` are arranged around the center of their cell. The other nodes are placed on a spiral
+        around an already placed neighbor in breadth-first order, facing away from the neighbor that this neighbor was
+        placed around. The nodes of each connected component without placed nodes are arranged in breadth-first order
+        on a spiral around its first node, so that they do not overlap, and the components are arranged in rows below
+        the placed nodes.
+        """
+        golden_angle = math.pi * (3 - math.sqrt(5))
+        node_ids = {node['id'] for node in nodes}
+        neighbors = {}
+        for edge in edges:
+            if edge['start'] in node_ids or edge['end'] in node_ids:
+                neighbors.setdefault(edge['start'], []).append(edge['end'])
+                neighbors.setdefault(edge['end'], []).append(edge['start'])
+        placed = dict(positions)
+        spiral_sizes = {}  # node id -> number of nodes on the spiral around the node
+        directions = {}  # node id -> angle at which the node was placed around its neighbor
+
+        def place_around(anchor: Any, node_id: Any) -> Tuple[float, float]:
+            count = spiral_sizes.get(anchor)
+            if count is None:
+                count = sum(1 for neighbor in neighbors[anchor] if neighbor in placed)
+            spiral_sizes[anchor] = count + 1
+            angle = count * golden_angle
+            if anchor in directions:
+                # the half-plane that faces away, which also keeps different paths from ending at the same position
+                angle = directions[anchor] + (angle / (2 * math.pi) % 1 - 0.5) * math.pi
+            directions[node_id] = angle
+            x, y = placed[anchor]
+            radius = LAYOUT_SPACING * math.sqrt(count + 1)
+            return x + radius * math.cos(angle), y + radius * math.sin(angle)
+
+        def spread(queue: deque) -> None:
+            while len(queue) > 0:
+                anchor = queue.popleft()
+                for neighbor in neighbors.get(anchor, ()):
+                    if neighbor in node_ids and neighbor not in placed:
+                        placed[neighbor] = place_around(anchor, neighbor)
+                        queue.append(neighbor)
+
+        def sunflower(x: float, y: float, count: int) -> Tuple[float, float]:
+            # the spiral positions keep at least the spacing to each other
+            radius = LAYOUT_SPACING * math.sqrt(count)
+            return x + radius * math.cos(count * golden_angle), y + radius * math.sin(count * golden_angle)
+
+        cells = {}
+        for node in nodes:
+            if node.get('node_cell') is not None:
+                cells.setdefault(tuple(node['node_cell']), []).append(node['id'])
+        if len(cells) > 0:
+            cell_size = 2 * LAYOUT_SPACING * (math.sqrt(max(len(ids) for ids in cells.values())) + 1)
+            for (row, column), ids in cells.items():
+                for count, node_id in enumerate(ids):
+                    placed[node_id] = sunflower(column * cell_size, row * cell_size, count)
+        spread(deque(node_id for node_id in placed if node_id in neighbors))
+
+        # pack the remaining components into rows
+        row_width = LAYOUT_SPACING * 4 * math.sqrt(len(nodes))
+        left = min((x for x, _ in placed.values()), default=0.0)
+        x_offset = left
+        y_offset = max((y for _, y in placed.values()), default=-2 * LAYOUT_SPACING) + 2 * LAYOUT_SPACING
+        row_height = 0.0
+        for node in nodes:
+            if node['id'] in placed:
+                continue
+            # breadth-first order
+            component = [node['id']]
+            visited = {node['id']}
+            for anchor in component:
+                for neighbor in neighbors.get(anchor, ()):
+                    if neighbor in node_ids and neighbor not in placed and neighbor not in visited:
+                        visited.add(neighbor)
+                        component.append(neighbor)
+            for count, node_id in enumerate(component):
+                placed[node_id] = sunflower(0.0, 0.0, count)
+            xs = [placed[node_id][0] for node_id in component]
+            ys = [placed[node_id][1] for node_id in component]
+            width, height = max(xs) - min(xs), max(ys) - min(ys)
+            if x_offset > left and x_offset + width > left + row_width:
+                x_offset = left
+                y_offset += row_height + 2 * LAYOUT_SPACING
+                row_height = 0.0
+            dx, dy = x_offset - min(xs), y_offset - min(ys)
+            for node_id in component:
+                x, y = placed[node_id]
+                placed[node_id] = (x + dx, y + dy)
+            x_offset += width + 2 * LAYOUT_SPACING
+            row_height = max(row_height, height)
+        return {node['id']: placed[node['id']] for node in nodes}
+
+    @staticmethod
+    def __get_position_resolver(positions: Dict[Any, Tuple[float, float]],
+                                default_mapping: Callable) -> Callable[[int, Dict], Any]:
+        default_resolver = Neo4jGraphWidget.__to_indexed_mapping(default_mapping)
+
+        def resolve_position(index: int, node: Dict) -> Any:
+            position = positions.get(node['id'])
+            return position if position is not None else default_resolver(index, node)
+
+        return resolve_position
+
+    @staticmethod
+    def __get_parent_resolver(parents: Dict[Any, Any],
+                              configured_mapping: Callable[[int, Dict], Any]) -> Callable[[int, Dict], Any]:
+        def resolve_parent(index: int, node: Dict) -> Any:
+            parent = parents.get(node['id'])
+            return parent if parent is not None else configured_mapping(index, node)
+
+        return Neo4jGraphWidget.__with_signature(resolve_parent)
+
+    @staticmethod
+    def __iter_graph_entities(values: Iterable[Any]) -> Iterator[Any]:
+        """
+        Yields the neo4j nodes and relationships in the given record values, including the start and end nodes of
+        relationships and the elements of paths, lists and maps. Elements may be yielded multiple times.
+        """
+        from neo4j.graph import Node, Relationship, Path
+
+        for value in values:
+            if isinstance(value, Node):
+                yield value
+            elif isinstance(value, Relationship):
+                yield value
+                yield value.start_node
+                yield value.end_node
+            elif isinstance(value, Path):
+                yield from value.nodes
+                yield from value.relationships
+            elif isinstance(value, (list, tuple)):
+                yield from Neo4jGraphWidget.__iter_graph_entities(value)
+            elif isinstance(value, dict):
+                yield from Neo4jGraphWidget.__iter_graph_entities(value.values())
+
+    @staticmethod
+    def __get_neo4j_item_text(element: Dict, label_key_ranks: Dict[str, int]) -> Union[str, None]:
+        # the property whose lowercase key comes first in NEO4J_LABEL_KEYS, without copying the properties
+        best_rank = None
+        text = None
+        for key, value in element.get('properties', {}).items():
+            rank = label_key_ranks.get(key.lower())
+            # later keys win for the same rank, like in a dict of the lowercase keys
+            if rank is not None and (best_rank is None or rank <= best_rank):
+                best_rank = rank
+                text = value
+        return str(text) if best_rank is not None else None
 
     @staticmethod
     def __configuration_mapper_factory(binding_key: str, configurations: Dict[str, Dict[str, str]],
-                                       default_mapping: Callable) -> Callable[[int, Dict], Union[Dict, str]]:
+                                       default_mapping: Callable,
+                                       column_values: Optional[Dict[str, ColumnValues]] = None
+                                       ) -> Callable[[int, Dict], Union[Dict, str]]:
         """
         This is called once for each POSSIBLE_NODE_BINDINGS or POSSIBLE_EDGE_BINDINGS (as `binding_key` argument) and
         sets the returned mapping function for the `binding_key` on the core yFiles Graphs for Jupyter widget.
@@ -211,66 +2792,184 @@ class Neo4jGraphWidget:
                   "*": { "color": "gray", ... }
                 }
             default_mapping (MethodType): A reference to the default binding of the yFiles Graphs for Jupyter core widget that should be used when the binding_key is not specified otherwise.
+            column_values (Optional[Dict]): The evaluated `ColumnBinding` values of the binding_key, keyed by the node
+                label or relationship type (see `__get_column_values`).
 
         Returns:
             FunctionType: A mapping function that can used in the yFiles Graphs for Jupyter core widget.
         """
 
+        if binding_key == "label":
+            label_key_ranks = {key: rank for rank, key in reversed(list(enumerate(NEO4J_LABEL_KEYS)))}
+
+            def default_resolver(index: int, item: Dict) -> Union[Dict, str]:
+                return Neo4jGraphWidget.__get_neo4j_item_text(item, label_key_ranks)
+        else:
+            default_resolver = Neo4jGraphWidget.__to_indexed_mapping(default_mapping)
+
+        # compile one resolver per configured label, so that each item only costs a dict lookup and a call
+        resolvers = {label: Neo4jGraphWidget.__compile_binding_resolver(binding_key, type_configuration)
+                     for label, type_configuration in configurations.items()}
+        wildcard_resolver = resolvers.get('*') or default_resolver
+        resolvers = {label: resolver or default_resolver for label, resolver in resolvers.items()}
+        for label, values in (column_values or {}).items():
+            resolvers[label] = Neo4jGraphWidget.__get_column_resolver(values, default_resolver)
+
         def mapping(index: int, item: Dict) -> Union[Dict, str]:
             label = item["properties"]["label"]  # yjg stores the neo4j node/relationship type in properties["label"]
-            if ((label in configurations or '*' in configurations)
-                    and binding_key in configurations.get(label, configurations.get('*'))):
-                type_configuration = configurations.get(label, configurations.get('*'))
-                if binding_key == 'parent_configuration':
-                    # the binding may be a lambda that must be resolved first
-                    binding = type_configuration.get(binding_key)
-                    if callable(binding):
-                        binding = binding(item)
-                    # parent_configuration binding may either resolve to a dict or a string
-                    if isinstance(binding, dict):
-                        group_label = binding.get('text', '')
-                    else:
-                        group_label = binding
-                    result = 'GroupNode' + group_label
-                # mapping
-                elif callable(type_configuration[binding_key]):
-                    result = type_configuration[binding_key](item)
-                # property name
-                elif (not isinstance(type_configuration[binding_key], dict) and
-                      type_configuration[binding_key] in item["properties"]):
-                    result = item["properties"][type_configuration.get(binding_key)]
-                # constant value
-                else:
-                    result = type_configuration.get(binding_key)
+            return resolvers.get(label, wildcard_resolver)(index, item)
 
-                return result
+        return Neo4jGraphWidget.__with_signature(mapping)
 
-            if binding_key == "label":
-                return Neo4jGraphWidget.__get_neo4j_item_text(item)
-            else:
-                # call default mapping
-                # some default mappings do not support "index" as first parameter
-                parameters = inspect.signature(default_mapping).parameters
-                if len(parameters) > 1 and parameters[list(parameters)[0]].annotation == int:
-                    return default_mapping(index, item)
-                else:
-                    return default_mapping(item)
+    @staticmethod
+    def __to_indexed_mapping(mapping: Callable) -> Callable[[int, Dict], Any]:
+        """
+        Returns the given mapping function with "index" as first parameter, like the core widget calls it.
+        """
+        # resolve the arity of the mapping once instead of for every item
+        # some default mappings do not support "index" as first parameter
+        parameters = inspect.signature(mapping).parameters
+        if len(parameters) > 1 and parameters[list(parameters)[0]].annotation == int:
+            return mapping
 
-        return mapping
+        def indexed_mapping(index: int, item: Dict) -> Any:
+            return mapping(item)
+
+        return indexed_mapping
+
+    @staticmethod
+    def __compile_binding_resolver(binding_key: str,
+                                   type_configuration: Dict[str, Any]) -> Optional[Callable[[int, Dict], Any]]:
+        """
+        Classifies the binding of `binding_key` in the given label configuration once and returns a resolver for it.
+
+        Args:
+            binding_key (str): One of POSSIBLE_NODE_BINDINGS or POSSIBLE_EDGE_BINDINGS
+            type_configuration (Dict): The configuration of a single node label or relationship type.
+
+        Returns:
+            Optional[Callable]: A resolver that is called with (index, item), or None if the configuration
+            does not specify the `binding_key`.
+        """
+        if binding_key not in type_configuration:
+            return None
+        binding = type_configuration[binding_key]
+        if isinstance(binding, ColumnBinding):
+            # resolved by the evaluated column values
+            return None
+
+        if binding_key == 'parent_configuration':
+            def resolve_group_label(value: Union[Dict, str]) -> str:
+                # parent_configuration binding may either resolve to a dict or a string
+                if isinstance(value, dict):
+                    return 'GroupNode' + value.get('text', '')
+                return 'GroupNode' + value
+
+            # the binding may be a lambda that must be resolved first
+            if callable(binding):
+                return lambda index, item: resolve_group_label(binding(item))
+            group_label = resolve_group_label(binding)
+            return lambda index, item: group_label
+
+        # mapping
+        if callable(binding):
+            return lambda index, item: binding(item)
+        # property name, falls back to the constant value if the item has no such property
+        if not isinstance(binding, dict):
+            def property_or_constant(index: int, item: Dict) -> Any:
+                properties = item["properties"]
+                return properties[binding] if binding in properties else binding
+            return property_or_constant
+        # constant value
+        return lambda index, item: binding
+
+    @staticmethod
+    def __get_column_resolver(column_values: ColumnValues, default_resolver: Callable) -> Callable[[int, Dict], Any]:
+        positions, ids, values = column_values
+        count, label_count = len(positions), len(ids)
+
+        def resolve_column_value(index: int, item: Dict) -> Any:
+            # the checks skip items that were not evaluated, e.g. items that are added to a shown widget
+            if index < count:
+                position = positions[index]
+                if position < label_count and ids[position] == item['id'] and values[position] is not None:
+                    return values[position]
+            return default_resolver(index, item)
+        return resolve_column_value
 
-    def __apply_heat_mapping(self, configuration, widget: GraphWidget) -> None:
+    @staticmethod
+    def __get_column_values(binding_key: str, configurations: Dict[str, Dict[str, Any]],
+                            items: List[Dict]) -> Dict[str, ColumnValues]:
+        """
+        Evaluates the `ColumnBinding`s of the given binding key once for the items of each label.
+
+        Returns:
+            Dict[str, ColumnValues]: The position of each item (by its index in `items`) within the items of its label,
+            and the ids and binding values of the items of the label by that position, keyed by the node label or
+            relationship type.
+        """
+        column_bindings = {label: configuration[binding_key] for label, configuration in configurations.items()
+                           if isinstance(configuration.get(binding_key), ColumnBinding)}
+        if len(column_bindings) == 0:
+            return {}
+
+        items_by_label = {}
+        positions = array('I', bytes(4 * len(items)))
+        for index, item in enumerate(items):
+            label_items = items_by_label.setdefault(item['properties']['label'], [])
+            positions[index] = len(label_items)
+            label_items.append(item)
+        column_values = {}
+        for label, label_items in items_by_label.items():
+            # like the other bindings, the "*" configuration is only used for labels without configuration
+            binding = column_bindings.get(label if label in configurations else '*')
+            if binding is None:
+                continue
+            column = Neo4jGraphWidget.__get_column(binding.property, label_items)
+            values = binding.function(column)
+            # plain python values, since NumPy values cannot be synchronized with the frontend
+            values = values.tolist() if hasattr(values, 'tolist') else list(values)
+            if len(values) != len(label_items):
+                raise ValueError(f"the column binding of '{binding_key}' for '{label}' returned {len(values)} values "
+                                 f"for {len(label_items)} items")
+            column_values[label] = (positions, [item['id'] for item in label_items],
+                                    [None if isinstance(value, float) and value != value else value
+                                     for value in values])
+        return column_values
+
+    @staticmethod
+    def __get_column(key: str, items: List[Dict]) -> Any:
+        import numpy as np
+
+        try:
+            return np.fromiter((item['properties'].get(key, np.nan) for item in items), dtype=float, count=len(items))
+        except (TypeError, ValueError):
+            # some values cannot be converted
+            column = np.empty(len(items))
+            for index, item in enumerate(items):
+                try:
+                    column[index] = float(item['properties'].get(key, np.nan))
+                except (TypeError, ValueError):
+                    column[index] = np.nan
+            return column
+
+    def __apply_heat_mapping(self, configuration, widget: "GraphWidget", nodes: List[Dict], edges: List[Dict]) -> None:
+        column_values = {
+            **Neo4jGraphWidget.__get_column_values('heat', self._node_configurations, nodes),
+            **Neo4jGraphWidget.__get_column_values('heat', self._edge_configurations, edges)}
         setattr(widget, "_heat_mapping",
                 Neo4jGraphWidget.__configuration_mapper_factory('heat', configuration,
-                                                                getattr(widget, 'default_heat_mapping')))
+                                                                getattr(widget, 'default_heat_mapping'), column_values))
 
-    def __create_group_nodes(self, configurations, widget: GraphWidget) -> None:
-        group_node_properties = set()
-        group_node_values = set()
+    def __get_group_nodes(self, configurations, nodes: List[Dict]) -> List[Dict]:
+        # ordered dict keys as an insertion ordered set of the group labels
+        group_labels = {}
+        group_configurations = {}
         key = 'parent_configuration'
-        for node in widget.nodes:
+        for node in nodes:
             label = node['properties']['label']
-            if label in configurations and key in configurations.get(label):
-                group_node = configurations.get(label).get(key)
+            if label in configurations and key in configurations[label]:
+                group_node = configurations[label][key]
 
                 if callable(group_node):
                     group_node = group_node(node)
@@ -278,57 +2977,76 @@ class Neo4jGraphWidget:
                 if isinstance(group_node, str):
                     # string or property value
                     if group_node in node["properties"]:
-                        group_node_properties.add(str(node["properties"][group_node]))
+                        group_labels[str(node["properties"][group_node])] = None
                     else:
-                        group_node_values.add(group_node)
+                        group_labels[group_node] = None
                 else:
                     # dictionary with values
                     text = group_node.get('text', '')
-                    group_node_values.add(text)
-                    configuration = {k: v for k, v in group_node.items() if k != 'text'}
-                    self.add_node_configuration(text, **configuration)
+                    group_labels[text] = None
+                    group_configurations[text] = {k: v for k, v in group_node.items() if k != 'text'}
+
+        for text, configuration in group_configurations.items():
+            self.add_node_configuration(text, **configuration)
 
-        for group_label in group_node_properties.union(group_node_values):
-            node = {'id': 'GroupNode' + group_label, 'properties': {'label': group_label}}
-            widget.nodes = [*widget.nodes, node]
+        return [{'id': 'GroupNode' + group_label, 'properties': {'label': group_label}} for group_label in group_labels]
 
-    def __apply_parent_mapping(self, widget: GraphWidget) -> None:
+    def __install_parent_mapping(self, widget: "GraphWidget", edges: List[Dict]) -> Tuple[List[Dict], Dict[Any, Any]]:
+        """
+        Adds the parent relationships among the given edges to the child to parent table of the widget, which is
+        resolved by the parent mapping that `__apply_node_mappings` installed, and records their ids and endpoints,
+        since they are not part of the widget edges.
+
+        Returns:
+            Tuple[List[Dict], Dict[Any, Any]]: The edges that are no parent relationships, and the parent node id of
+            each child node id.
+        """
         node_to_parent = {}
-        edge_ids_to_remove = set()
-        for edge in widget.edges[:]:
-            rel_type = edge["properties"]["label"]
-            for (parent_type, is_reversed) in self._parent_configurations:
-                if rel_type == parent_type:
-                    start = edge['start']  # child node id
-                    end = edge['end']  # parent node id
-                    if is_reversed:
-                        node_to_parent[end] = start
-                    else:
-                        node_to_parent[start] = end
-                    edge_ids_to_remove.add(edge['id'])
-                    break
+        kept_edges = []
+        parent_configurations = self._parent_configurations
+        parent_relationships = widget._parent_relationships
+        for edge in edges:
+            is_reversed = parent_configurations.get(edge["properties"]["label"])
+            if is_reversed is None:
+                kept_edges.append(edge)
+                continue
+            parent_relationships[edge['id']] = (edge['start'], edge['end'])
+            if is_reversed:
+                node_to_parent[edge['end']] = edge['start']
+            else:
+                node_to_parent[edge['start']] = edge['end']  # child node id -> parent node id
 
-        # use list comprehension to filter out the edges to automatically trigger model sync with the frontend
-        widget.edges = [edge for edge in widget.edges if edge['id'] not in edge_ids_to_remove]
-        current_parent_mapping = getattr(widget, '_node_parent_mapping')
-        setattr(widget, "_node_parent_mapping",
-                lambda index, node: node_to_parent.get(node['id'], current_parent_mapping(index, node)))
+        # updated in place, so that the installed mapping resolves the parents of all merged graphs with one lookup
+        widget._parent_table.update(node_to_parent)
+        return kept_edges, node_to_parent
 
-    def __apply_node_mappings(self, widget: GraphWidget) -> None:
+    def __apply_node_mappings(self, widget: "GraphWidget", nodes: List[Dict]) -> None:
+        positions = getattr(widget, '_precomputed_positions', None)
         for key in POSSIBLE_NODE_BINDINGS:
             default_mapping = getattr(widget, f"default_node_{key}_mapping")
+            if key == 'position' and positions is not None:
+                default_mapping = Neo4jGraphWidget.__get_position_resolver(positions, default_mapping)
+            column_values = Neo4jGraphWidget.__get_column_values(key, self._node_configurations, nodes)
             setattr(widget, f"_node_{key}_mapping",
-                    Neo4jGraphWidget.__configuration_mapper_factory(key, self._node_configurations, default_mapping))
-        # manually set parent configuration
+                    Neo4jGraphWidget.__configuration_mapper_factory(key, self._node_configurations, default_mapping,
+                                                                    column_values))
+        # manually set parent configuration, the parent relationships are added to the table by
+        # __install_parent_mapping
+        widget._parent_table = {}
+        widget._parent_relationships = {}  # id -> (start id, end id) of the converted parent relationships
+        configured_parent_mapping = Neo4jGraphWidget.__configuration_mapper_factory('parent_configuration',
+                                                                                    self._node_configurations,
+                                                                                    lambda node: None)
         setattr(widget, f"_node_parent_mapping",
-                Neo4jGraphWidget.__configuration_mapper_factory('parent_configuration',
-                                                                self._node_configurations, lambda node: None))
+                Neo4jGraphWidget.__get_parent_resolver(widget._parent_table, configured_parent_mapping))
 
-    def __apply_edge_mappings(self, widget: GraphWidget) -> None:
+    def __apply_edge_mappings(self, widget: "GraphWidget", edges: List[Dict]) -> None:
         for key in POSSIBLE_EDGE_BINDINGS:
             default_mapping = getattr(widget, f"default_edge_{key}_mapping")
+            column_values = Neo4jGraphWidget.__get_column_values(key, self._edge_configurations, edges)
             setattr(widget, f"_edge_{key}_mapping",
-                    Neo4jGraphWidget.__configuration_mapper_factory(key, self._edge_configurations, default_mapping))
+                    Neo4jGraphWidget.__configuration_mapper_factory(key, self._edge_configurations, default_mapping,
+                                                                    column_values))
 
     def add_node_configuration(self, label: Union[str, list[str]], **kwargs: Dict[str, Any]) -> None:
         """
@@ -345,6 +3063,9 @@ class Neo4jGraphWidget:
                 - `property` (Union[Dict, Callable]): Allows to specify additional properties on the node, which may be bound by other bindings.
                 - `type` (Union[Dict, Callable]): Defines a specific "type" for the node which affects the automatic positioning of nodes (same "type"s are preferred to be placed next to each other).
                 - `parent_configuration` (Union[str, Callable]): Configure grouping for this node label.
+                - `collapse_configuration` (Union[bool, str, Dict]): Collapse the nodes of this label into a summary node
+                  per label (True), per value of a property key, or as dict with optional `group_by` key and
+                  `aggregations` of properties (e.g. {'age': 'avg'}). The summary is computed by the database.
 
         Returns:
             None
@@ -376,6 +3097,8 @@ class Neo4jGraphWidget:
                 - `color` (Union[str, Callable]): The relationship's color.
                 - `thickness_factor` (Union[str, Callable]): The relationship's stroke thickness factor. By default, 1.
                 - `property` (Union[Dict, Callable]): Allows to specify additional properties on the relationship, which may be bound by other bindings.
+                - `collapse_configuration` (Union[bool, Dict]): Merge the parallel relationships of this type into
+                  weighted edges with a `count` (True), or as dict with `aggregations` of properties.
 
         Returns:
             None
@@ -409,9 +3132,9 @@ class Neo4jGraphWidget:
         """
         if isinstance(type, list):
             for t in type:
-                self._parent_configurations.add((t, reverse))
+                self._parent_configurations[t] = bool(reverse)
         else:
-            self._parent_configurations.add((type, reverse))
+            self._parent_configurations[type] = bool(reverse)
 
     # noinspection PyShadowingBuiltins
     def del_node_configuration(self, label: Union[str, list[str]]) -> None:
@@ -466,13 +3189,10 @@ class Neo4jGraphWidget:
             None
         """
         if isinstance(type, list):
-            self._parent_configurations = {
-                rel_type for rel_type in self._parent_configurations if rel_type[0] not in type
-            }
+            for t in type:
+                self._parent_configurations.pop(t, None)
         else:
-            self._parent_configurations = {
-                rel_type for rel_type in self._parent_configurations if rel_type[0] != type
-            }
+            self._parent_configurations.pop(type, None)
 
     def get_selected_node_ids(self, widget: Optional[Type["Neo4jGraphWidget"]] = None) -> List[str]:
         """
@@ -486,6 +3206,8 @@ class Neo4jGraphWidget:
             List[str]: The list of node ids currently selected in the widget.
         """
         graph = widget if widget is not None else self._widget
+        if graph is None:
+            return []
         nodes, edges = graph.get_selection()
         return list(map(lambda node: node['id'], nodes))
 
@@ -501,6 +3223,8 @@ class Neo4jGraphWidget:
             List[str]: The list of relationship ids currently selected in the widget.
         """
         graph = widget if widget is not None else self._widget
+        if graph is None:
+            return []
         nodes, edges = graph.get_selection()
         return list(map(lambda edge: edge['id'], edges))
 
@@ -1,3 +1,3 @@
 # see Yfiles_Neo4j_Graphs.py
 
-from .Yfiles_Neo4j_Graphs import Neo4jGraphWidget
+from .Yfiles_Neo4j_Graphs import Neo4jGraphWidget, ColumnBinding
@@ -0,0 +1,369 @@
+"""
+Drivers that answer the queries of `Neo4jGraphWidget` without a database, e.g. for offline demos and benchmarks.
+
+Both drivers replay responses, which are recorded from a real driver or generated as synthetic graphs:
+
+    from yfiles_jupyter_graphs_for_neo4j.replay import ReplayDriver
+
+    driver = ReplayDriver.synthetic(10000, 20000, labels={'Person': 3, 'Movie': 1})
+    g = Neo4jGraphWidget(driver)
+    g.show_cypher("MATCH (s)-[r]->(t) RETURN s,r,t")
+"""
+import pickle
+import random
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from neo4j import Record
+from neo4j.graph import Graph, Node, Path, Relationship
+
+
+# The neo4j driver offers no public way to build graphs, so the following functions add the entities like the driver
+# adds them while it hydrates records. They are the only accesses to internals of `neo4j.graph`, which are checked by
+# the tests for the versions of the `replay` extra.
+
+def _add_entity(graph: Graph, entity: Any) -> None:
+    entities = graph._relationships if isinstance(entity, Relationship) else graph._nodes
+    entities[entity.element_id] = entity
+
+
+def _new_node(graph: Graph, element_id: str, id: int, labels: List[str], properties: Dict[str, Any]) -> Node:
+    node = Node(graph, element_id, id, labels, properties)
+    _add_entity(graph, node)
+    return node
+
+
+def _new_relationship(graph: Graph, element_id: str, id: int, type: str, start: Node, end: Node,
+                      properties: Dict[str, Any]) -> Relationship:
+    relationship = graph.relationship_type(type)(graph, element_id, id, properties)
+    relationship._start_node = start
+    relationship._end_node = end
+    _add_entity(graph, relationship)
+    return relationship
+
+
+class ReplayDriver:
+    """
+    A driver whose sessions answer each query with a recorded response instead of running it against a database.
+
+    Queries are looked up by their text. Other queries are answered with the default response, and EXPLAIN queries
+    with the keys of the default response and no records. Therefore, features that run additional queries on the
+    database, e.g. the sampling of the element budget, the collapse configurations or `expand`, are only meaningful
+    for recorded responses of these queries.
+    """
+
+    def __init__(self, keys: List[str], rows: List[List[Any]], graph: Optional[Graph] = None):
+        """
+        Initializes a driver with a default response.
+
+        Args:
+            keys (List[str]): The keys of the records of the default response.
+            rows (List[List[Any]]): The values of the records of the default response.
+            graph (Optional[neo4j.graph.Graph]): The graph of the nodes and relationships in the rows. By default, the
+                graph is collected from the rows.
+
+        Returns:
+            None
+        """
+        self._default_response = ReplayDriver.__to_response(keys, rows, graph)
+        self._responses = {}
+        self.queries = []  # the text of each run query
+        self.parameters = []  # the parameters of each run query
+        self.timeouts = []  # the transaction timeout of each run query, or None
+        self.sessions = []  # the configuration of each opened session
+
+    @classmethod
+    def record(cls, driver: Any, cypher: str, database: Optional[str] = None,
+               **parameters: Dict[str, Any]) -> "ReplayDriver":
+        """
+        Creates a replay driver whose default response is the result of the given query on the given driver.
+
+        Args:
+            driver (neo4j.Driver): The driver that runs the query.
+            cypher (str): The Cypher query.
+            database (Optional[str]): The database of the session. By default, the default database of the server.
+            **parameters (Dict[str, Any]): The parameters of the query.
+
+        Returns:
+            ReplayDriver: The replay driver.
+        """
+        keys, rows, graph = ReplayDriver.__run(driver, cypher, database, parameters)
+        return cls(keys, rows, graph)
+
+    def add_recorded_response(self, driver: Any, cypher: str, database: Optional[str] = None,
+                              **parameters: Dict[str, Any]) -> None:
+        """
+        Records the result of the given query on the given driver as response to the query.
+
+        Args:
+            driver (neo4j.Driver): The driver that runs the query.
+            cypher (str): The Cypher query.
+            database (Optional[str]): The database of the session. By default, the default database of the server.
+            **parameters (Dict[str, Any]): The parameters of the query.
+
+        Returns:
+            None
+        """
+        self._responses[cypher.strip()] = ReplayDriver.__run(driver, cypher, database, parameters)
+
+    def add_response(self, cypher: str, keys: List[str], rows: List[List[Any]], graph: Optional[Graph] = None) -> None:
+        """
+        Adds the response to the given query.
+
+        Args:
+            cypher (str): The Cypher query.
+            keys (List[str]): The keys of the records.
+            rows (List[List[Any]]): The values of the records.
+            graph (Optional[neo4j.graph.Graph]): The graph of the nodes and relationships in the rows. By default, the
+                graph is collected from the rows.
+
+        Returns:
+            None
+        """
+        self._responses[cypher.strip()] = ReplayDriver.__to_response(keys, rows, graph)
+
+    @classmethod
+    def synthetic(cls, node_count: int, relationship_count: int, labels: Optional[Dict[str, float]] = None,
+                  relationship_types: Optional[Dict[str, float]] = None,
+                  node_properties: Optional[Dict[str, Callable[[random.Random, int], Any]]] = None,
+                  relationship_properties: Optional[Dict[str, Callable[[random.Random, int], Any]]] = None,
+                  seed: int = 0) -> "ReplayDriver":
+        """
+        Creates a replay driver whose default response is a random graph.
+
+        The response has a record `s, r, t` per relationship and a record `s, NULL, NULL` per node without
+        relationships, like the result of `MATCH (s) OPTIONAL MATCH (s)-[r]->(t) RETURN s,r,t`.
+
+        Args:
+            node_count (int): The number of nodes.
+            relationship_count (int): The number of relationships between random nodes.
+            labels (Optional[Dict[str, float]]): The relative frequencies of the node labels. By default, 3 `Person`
+                nodes per `Movie` node.
+            relationship_types (Optional[Dict[str, float]]): The relative frequencies of the relationship types. By
+                default, `KNOWS` and `ACTED_IN` are equally frequent.
+            node_properties (Optional[Dict[str, Callable]]): The functions that create the property values of a node
+                from a random generator and the index of the node. By default, a `name` and a uniform `score`.
+            relationship_properties (Optional[Dict[str, Callable]]): The functions that create the property values of a
+                relationship from a random generator and the index of the relationship. By default, an exponentially
+                distributed `weight`.
+            seed (int): The seed of the random generator, so that the same graph is created for the same arguments.
+
+        Returns:
+            ReplayDriver: The replay driver.
+        """
+        if labels is None:
+            labels = {'Person': 3, 'Movie': 1}
+        if relationship_types is None:
+            relationship_types = {'KNOWS': 1, 'ACTED_IN': 1}
+        if node_properties is None:
+            node_properties = {'name': lambda rnd, index: f"Node {index}",
+                               'score': lambda rnd, index: rnd.random()}
+        if relationship_properties is None:
+            relationship_properties = {'weight': lambda rnd, index: rnd.expovariate(1.0)}
+        if node_count <= 0 and relationship_count > 0:
+            raise ValueError("relationships require at least one node")
+
+        rnd = random.Random(seed)
+        graph = Graph()
+        node_labels = rnd.choices(list(labels), weights=list(labels.values()), k=node_count)
+        nodes = []
+        for index, label in enumerate(node_labels):
+            element_id = f"4:replay:{index}"
+            node = _new_node(graph, element_id, index, [label],
+                             {key: function(rnd, index) for key, function in node_properties.items()})
+            nodes.append(node)
+
+        types = rnd.choices(list(relationship_types), weights=list(relationship_types.values()),
+                            k=relationship_count)
+        rows = []
+        connected = set()
+        for index, relationship_type in enumerate(types):
+            start = nodes[rnd.randrange(node_count)]
+            end = nodes[rnd.randrange(node_count)]
+            element_id = f"5:replay:{index}"
+            relationship = _new_relationship(
+                graph, element_id, index, relationship_type, start, end,
+                {key: function(rnd, index) for key, function in relationship_properties.items()})
+            rows.append([start, relationship, end])
+            connected.add(start.id)
+            connected.add(end.id)
+        rows.extend([node, None, None] for node in nodes if node.id not in connected)
+        return cls(['s', 'r', 't'], rows, graph)
+
+    def save(self, path: str) -> None:
+        """
+        Saves the responses to the given file, so that they can be replayed without the database.
+
+        Args:
+            path (str): The path of the file.
+
+        Returns:
+            None
+        """
+        with open(path, 'wb') as file:
+            pickle.dump({'default': self._default_response, 'responses': self._responses}, file)
+
+    @classmethod
+    def load(cls, path: str) -> "ReplayDriver":
+        """
+        Loads a replay driver from responses that are saved with `save`. Only load files from trusted sources, since
+        they are unpickled.
+
+        Args:
+            path (str): The path of the file.
+
+        Returns:
+            ReplayDriver: The replay driver.
+        """
+        with open(path, 'rb') as file:
+            state = pickle.load(file)
+        driver = cls(*state['default'])
+        driver._responses = state['responses']
+        return driver
+
+    def session(self, **config: Dict[str, Any]) -> "_ReplaySession":
+        self.sessions.append(config)
+        return _ReplaySession(self)
+
+    def close(self) -> None:
+        pass
+
+    def _get_response(self, query: Any, parameters: Dict[str, Any]) -> Tuple[List[str], List[List[Any]], Graph]:
+        # the query is either the Cypher text or a neo4j.Query, e.g. with a transaction timeout
+        cypher = getattr(query, 'text', query).strip()
+        self.queries.append(cypher)
+        self.parameters.append(parameters)
+        self.timeouts.append(getattr(query, 'timeout', None))
+        response = self._responses.get(cypher)
+        if response is not None:
+            return response
+        if cypher.upper().startswith('EXPLAIN'):
+            return self._default_response[0], [], Graph()
+        return self._default_response
+
+    @staticmethod
+    def __run(driver: Any, cypher: str, database: Optional[str],
+              parameters: Dict[str, Any]) -> Tuple[List[str], List[List[Any]], Graph]:
+        with driver.session(database=database) as session:
+            result = session.run(cypher, **parameters)
+            keys = list(result.keys())
+            rows = [record.values() for record in result]
+            return keys, rows, result.graph()
+
+    @staticmethod
+    def __to_response(keys: List[str], rows: List[List[Any]],
+                      graph: Optional[Graph]) -> Tuple[List[str], List[List[Any]], Graph]:
+        if graph is None:
+            graph = Graph()
+            for entity in ReplayDriver.__iter_entities(rows):
+                _add_entity(graph, entity)
+        return list(keys), [list(row) for row in rows], graph
+
+    @staticmethod
+    def __iter_entities(values: Any) -> Iterator[Any]:
+        for value in values:
+            if isinstance(value, Node):
+                yield value
+            elif isinstance(value, Relationship):
+                yield value
+                yield value.start_node
+                yield value.end_node
+            elif isinstance(value, Path):
+                yield from value.nodes
+                yield from value.relationships
+            elif isinstance(value, (list, tuple)):
+                yield from ReplayDriver.__iter_entities(value)
+            elif isinstance(value, dict):
+                yield from ReplayDriver.__iter_entities(value.values())
+
+
+class AsyncReplayDriver(ReplayDriver):
+    """
+    The asynchronous variant of `ReplayDriver`, e.g. for `show_cypher_async`.
+    """
+
+    def session(self, **config: Dict[str, Any]) -> "_AsyncReplaySession":
+        self.sessions.append(config)
+        return _AsyncReplaySession(self)
+
+    async def close(self) -> None:
+        pass
+
+
+class _ReplayResult:
+    """
+    Replays the records of a response like a `neo4j.Result`.
+    """
+
+    def __init__(self, response: Tuple[List[str], List[List[Any]], Graph]):
+        self._keys, self._rows, self._graph = response
+        self._index = 0
+
+    def keys(self) -> List[str]:
+        return list(self._keys)
+
+    def __iter__(self) -> Iterator[Record]:
+        while self._index < len(self._rows):
+            self._index += 1
+            yield Record(zip(self._keys, self._rows[self._index - 1]))
+
+    def graph(self) -> Graph:
+        self._index = len(self._rows)
+        return self._graph
+
+    def consume(self) -> None:
+        self._index = len(self._rows)
+
+
+class _AsyncReplayResult(_ReplayResult):
+    """
+    Replays the records of a response like a `neo4j.AsyncResult`.
+    """
+
+    def __aiter__(self) -> "_AsyncReplayResult":
+        return self
+
+    async def __anext__(self) -> Record:
+        if self._index >= len(self._rows):
+            raise StopAsyncIteration
+        self._index += 1
+        return Record(zip(self._keys, self._rows[self._index - 1]))
+
+    async def graph(self) -> Graph:
+        return super().graph()
+
+    async def consume(self) -> None:
+        super().consume()
+
+
+class _ReplaySession:
+    def __init__(self, driver: ReplayDriver):
+        self._driver = driver
+
+    def __enter__(self) -> "_ReplaySession":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def run(self, query: Any, parameters: Optional[Dict[str, Any]] = None, **kwargs: Any) -> _ReplayResult:
+        return _ReplayResult(self._driver._get_response(query, {**(parameters or {}), **kwargs}))
+
+    def close(self) -> None:
+        pass
+
+
+class _AsyncReplaySession:
+    def __init__(self, driver: ReplayDriver):
+        self._driver = driver
+
+    async def __aenter__(self) -> "_AsyncReplaySession":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def run(self, query: Any, parameters: Optional[Dict[str, Any]] = None, **kwargs: Any) -> _AsyncReplayResult:
+        return _AsyncReplayResult(self._driver._get_response(query, {**(parameters or {}), **kwargs}))
+
+    async def close(self) -> None:
+        pass
@@ -0,0 +1,46 @@
+import contextlib
+import io
+from typing import Any, Iterator
+
+import pytest
+
+NEO4J_IMAGE = "neo4j:5.26"
+
+
+def pytest_configure(config: Any) -> None:
+    config.addinivalue_line("markers", "neo4j: runs the generated Cypher against a Neo4j server in a container "
+                                       "(requires testcontainers and Docker, skipped otherwise)")
+
+
+@pytest.fixture(scope="session")
+def neo4j_server() -> Iterator[Any]:
+    """
+    A Neo4j server in a container, whose driver is yielded.
+    """
+    neo4j = pytest.importorskip("testcontainers.neo4j")
+    try:
+        container = neo4j.Neo4jContainer(NEO4J_IMAGE).start()
+    except Exception as error:
+        pytest.skip(f"cannot start a Neo4j container: {error}")
+    driver = container.get_driver()
+    try:
+        yield driver
+    finally:
+        driver.close()
+        container.stop()
+
+
+@pytest.fixture
+def neo4j_driver(neo4j_server: Any) -> Any:
+    """
+    The driver of the Neo4j server with an empty database.
+    """
+    neo4j_server.execute_query("MATCH (n) DETACH DELETE n")
+    return neo4j_server
+
+
+@contextlib.contextmanager
+def quiet() -> Iterator[None]:
+    # display() prints the widget outside of notebooks
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
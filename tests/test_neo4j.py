@@ -0,0 +1,126 @@
+"""
+Runs the Cypher queries that are generated by `Neo4jGraphWidget` against a Neo4j server.
+"""
+from typing import Any, List, Set
+
+import pytest
+
+from yfiles_jupyter_graphs_for_neo4j import Neo4jGraphWidget
+
+from conftest import quiet
+
+pytestmark = pytest.mark.neo4j
+
+MOVIES = """
+    CREATE (keanu:Person {name: 'Keanu', born: 1964}), (carrie:Person {name: 'Carrie', born: 1967}),
+           (laurence:Person {name: 'Laurence', born: 1961}), (hugo:Person {name: 'Hugo', born: 1960}),
+           (matrix:Movie {title: 'The Matrix', released: 1999}), (reloaded:Movie {title: 'Reloaded', released: 2003}),
+           (keanu)-[:ACTED_IN {roles: ['Neo']}]->(matrix), (carrie)-[:ACTED_IN {roles: ['Trinity']}]->(matrix),
+           (laurence)-[:ACTED_IN {roles: ['Morpheus']}]->(matrix), (hugo)-[:ACTED_IN {roles: ['Smith']}]->(matrix),
+           (keanu)-[:ACTED_IN {roles: ['Neo']}]->(reloaded), (carrie)-[:ACTED_IN {roles: ['Trinity']}]->(reloaded),
+           (keanu)-[:KNOWS]->(carrie), (carrie)-[:KNOWS]->(laurence)
+"""
+
+
+def show(widget: Neo4jGraphWidget, cypher: str, **kwargs: Any) -> None:
+    with quiet():
+        widget.show_cypher(cypher, **kwargs)
+
+
+def texts(items: List[dict], key: str = 'name') -> Set[Any]:
+    return {item['properties'].get(key) for item in items}
+
+
+@pytest.mark.parametrize("cypher", [
+    "MATCH (p:Person) RETURN {person: p} AS result",
+    "MATCH (p:Person) RETURN collect({person: p}) AS result",
+    "MATCH (p:Person) RETURN {people: [p]} AS result",
+    "MATCH (p:Person) RETURN p",
+])
+def test_autocomplete_resolves_nodes_in_maps(neo4j_driver: Any, cypher: str) -> None:
+    neo4j_driver.execute_query(MOVIES)
+    widget = Neo4jGraphWidget(neo4j_driver, autocomplete_relationships=True)
+    show(widget, cypher)
+    assert texts(widget._widget.nodes) == {'Keanu', 'Carrie', 'Laurence', 'Hugo'}
+    assert len(widget._widget.edges) == 2
+
+
+def test_autocomplete_filters_relationship_types(neo4j_driver: Any) -> None:
+    neo4j_driver.execute_query(MOVIES)
+    widget = Neo4jGraphWidget(neo4j_driver, autocomplete_relationships=['ACTED_IN'])
+    show(widget, "MATCH (n) RETURN n")
+    assert len(widget._widget.nodes) == 6
+    assert {edge['properties']['label'] for edge in widget._widget.edges} == {'ACTED_IN'}
+
+
+def captions(items: List[dict]) -> Set[Any]:
+    return {item['properties'].get('name', item['properties'].get('title')) for item in items}
+
+
+@pytest.mark.parametrize("cypher", [
+    "MATCH (n) RETURN n",
+    "MATCH (n) RETURN {node: n} AS result",
+    "MATCH p = ()-[]->() RETURN p",
+])
+def test_degree_sampling_returns_the_nodes_with_the_most_relationships(neo4j_driver: Any, cypher: str) -> None:
+    neo4j_driver.execute_query(MOVIES)
+    widget = Neo4jGraphWidget(neo4j_driver)
+    widget.set_element_budget(4, sampling='degree')
+    show(widget, cypher)
+    # Carrie and The Matrix have 4 relationships each, and Carrie acted in The Matrix
+    assert captions(widget._widget.nodes) == {'Carrie', 'The Matrix'}
+    assert [edge['properties']['label'] for edge in widget._widget.edges] == ['ACTED_IN']
+
+
+def test_random_sampling_stays_within_the_budget(neo4j_driver: Any) -> None:
+    neo4j_driver.execute_query(MOVIES)
+    widget = Neo4jGraphWidget(neo4j_driver, autocomplete_relationships=['KNOWS'])
+    widget.set_element_budget(5, sampling='random')
+    show(widget, "MATCH (n) RETURN n")
+    assert len(widget._widget.nodes) == 2
+    assert len(widget._widget.nodes) + len(widget._widget.edges) <= 5
+    assert {edge['properties']['label'] for edge in widget._widget.edges} <= {'KNOWS'}
+
+
+def test_results_within_the_budget_are_not_sampled(neo4j_driver: Any) -> None:
+    neo4j_driver.execute_query(MOVIES)
+    widget = Neo4jGraphWidget(neo4j_driver)
+    widget.set_element_budget(100, sampling='degree')
+    show(widget, "MATCH (s)-[r]->(t) RETURN s, r, t")
+    assert len(widget._widget.nodes) == 6
+    assert len(widget._widget.edges) == 8
+
+
+def test_collapse_summarizes_the_nodes_of_a_label(neo4j_driver: Any) -> None:
+    neo4j_driver.execute_query(MOVIES)
+    widget = Neo4jGraphWidget(neo4j_driver)
+    widget.add_node_configuration('Person', collapse_configuration={'aggregations': {'born': 'avg'}})
+    show(widget, "MATCH (s)-[r]->(t) RETURN s, r, t")
+    summary = next(node for node in widget._widget.nodes if node['id'] == 'CollapsedPerson')
+    assert summary['properties']['count'] == 4
+    assert summary['properties']['avg_born'] == 1963.0
+    assert captions(widget._widget.nodes) == {'The Matrix', 'Reloaded', None}
+    counts = sorted((edge['properties']['label'], edge['properties']['count']) for edge in widget._widget.edges)
+    assert counts == [('ACTED_IN', 2), ('ACTED_IN', 4), ('KNOWS', 2)]
+
+
+def test_collapse_groups_the_nodes_in_maps(neo4j_driver: Any) -> None:
+    neo4j_driver.execute_query(MOVIES)
+    widget = Neo4jGraphWidget(neo4j_driver)
+    widget.add_node_configuration('Movie', collapse_configuration='released')
+    show(widget, "MATCH (p:Person)-[r:ACTED_IN]->(m) RETURN {person: p, acted: r, movie: m} AS row")
+    assert {node['id'] for node in widget._widget.nodes if isinstance(node['id'], str)} == \
+        {'CollapsedMovie:1999', 'CollapsedMovie:2003'}
+    assert captions(widget._widget.nodes) >= {'Keanu', 'Carrie', 'Laurence', 'Hugo'}
+    assert len(widget._widget.edges) == 6
+
+
+def test_expand_collapsed_loads_the_members_and_their_relationships(neo4j_driver: Any) -> None:
+    neo4j_driver.execute_query(MOVIES)
+    widget = Neo4jGraphWidget(neo4j_driver)
+    widget.add_node_configuration('Person', collapse_configuration=True)
+    show(widget, "MATCH (s)-[r]->(t) RETURN s, r, t")
+    widget.expand_collapsed(['CollapsedPerson'])
+    assert captions(widget._widget.nodes) == {'Keanu', 'Carrie', 'Laurence', 'Hugo', 'The Matrix', 'Reloaded'}
+    labels = sorted(edge['properties']['label'] for edge in widget._widget.edges)
+    assert labels == ['ACTED_IN'] * 6 + ['KNOWS'] * 2
@@ -0,0 +1,667 @@
+"""
+Runs the pipeline of `Neo4jGraphWidget` on recorded and synthetic responses of the replay drivers.
+"""
+import asyncio
+import os
+import subprocess
+import sys
+from typing import Any, Dict, List, Tuple
+
+import pytest
+from neo4j import Bookmarks
+from neo4j.exceptions import ClientError
+from neo4j.spatial import CartesianPoint
+from neo4j.time import Date, DateTime
+from yfiles_jupyter_graphs import GraphWidget
+
+from yfiles_jupyter_graphs_for_neo4j import ColumnBinding, Neo4jGraphWidget
+from yfiles_jupyter_graphs_for_neo4j.Yfiles_Neo4j_Graphs import _CompactGraph
+from yfiles_jupyter_graphs_for_neo4j.replay import AsyncReplayDriver, ReplayDriver
+
+from conftest import quiet
+
+# the widget items are identified by the legacy neo4j ids, like the items of the core widget
+pytestmark = pytest.mark.filterwarnings("ignore:`id` is deprecated:DeprecationWarning")
+
+CYPHER = "MATCH (s) OPTIONAL MATCH (s)-[r]->(t) RETURN s,r,t"
+NODE_PROPERTIES = {
+    'name': lambda rnd, index: f"Node {index}",
+    'score': lambda rnd, index: rnd.random(),
+    'when': lambda rnd, index: DateTime(2020, 1, 2, 3, 4, 5),
+    'day': lambda rnd, index: Date(2020, 1, 2),
+    'at': lambda rnd, index: CartesianPoint((1.0, 2.0)),
+    'tags': lambda rnd, index: ['a', 'b'],
+}
+
+
+def by_id(items: List[Dict]) -> List[Dict]:
+    return sorted(items, key=lambda item: str(item['id']))
+
+
+def items(widget: Neo4jGraphWidget) -> Tuple[List[Dict], List[Dict]]:
+    return by_id(widget._widget.nodes), by_id(widget._widget.edges)
+
+
+def show(widget: Neo4jGraphWidget, cypher: str = CYPHER, **kwargs: Any) -> None:
+    with quiet():
+        widget.show_cypher(cypher, **kwargs)
+
+
+def configure(widget: Neo4jGraphWidget) -> None:
+    widget.add_node_configuration('Person', color='#2a9d8f', size=(40, 40), parent_configuration='label')
+    widget.add_node_configuration('Movie', text='score')
+    widget.add_relationship_configuration('KNOWS', thickness_factor=3)
+    widget.add_parent_relationship_configuration('ACTED_IN')
+
+
+class WithoutSubqueries:
+    """
+    Rejects the queries that wrap another query in a CALL subquery, like a database without the required Cypher features.
+    """
+
+    def _get_response(self, query: Any, parameters: Dict[str, Any]) -> Any:
+        response = super()._get_response(query, parameters)
+        if self.queries[-1].startswith('CALL'):
+            raise ClientError("subqueries are not supported")
+        return response
+
+
+class ReplayDriverWithoutSubqueries(WithoutSubqueries, ReplayDriver):
+    pass
+
+
+class AsyncReplayDriverWithoutSubqueries(WithoutSubqueries, AsyncReplayDriver):
+    pass
+
+
+@pytest.fixture
+def driver() -> ReplayDriver:
+    return ReplayDriver.synthetic(200, 400, node_properties=NODE_PROPERTIES)
+
+
+def test_synthetic_graphs_are_built_like_hydrated_records() -> None:
+    # the synthetic graphs are built with internals of neo4j.graph, which must behave like hydrated records
+    driver = ReplayDriver.synthetic(2, 1, labels={'Person': 1}, relationship_types={'KNOWS': 1},
+                                    node_properties={'name': lambda rnd, index: f"Node {index}"},
+                                    relationship_properties={'weight': lambda rnd, index: 2.0})
+    with driver.session() as session:
+        result = session.run(CYPHER)
+        start, relationship, end = next(iter(result)).values()
+        graph = result.graph()
+    assert [node.element_id for node in graph.nodes] == ["4:replay:0", "4:replay:1"]
+    assert [node.id for node in graph.nodes] == [0, 1]
+    assert [set(node.labels) for node in graph.nodes] == [{'Person'}, {'Person'}]
+    assert [node['name'] for node in graph.nodes] == ["Node 0", "Node 1"]
+    assert list(graph.relationships) == [relationship]
+    assert (relationship.element_id, relationship.id, relationship.type) == ("5:replay:0", 0, 'KNOWS')
+    assert dict(relationship) == {'weight': 2.0}
+    assert relationship.start_node is start and relationship.end_node is end
+    assert relationship.graph is graph and start.graph is graph
+    assert set(relationship.nodes) <= set(graph.nodes)
+
+
+def test_converted_items_equal_the_import_of_the_core_widget(driver: ReplayDriver) -> None:
+    with driver.session() as session:
+        graph = session.run(CYPHER).graph()
+    widget = GraphWidget(graph=graph)
+    nodes, edges = _CompactGraph.from_graph(graph).to_items()
+    assert by_id(nodes) == by_id(widget.nodes)
+    assert by_id(edges) == by_id(widget.edges)
+
+
+def test_show_cypher_async_equals_show_cypher(driver: ReplayDriver) -> None:
+    widget = Neo4jGraphWidget(driver)
+    configure(widget)
+    show(widget)
+    async_widget = Neo4jGraphWidget(AsyncReplayDriver.synthetic(200, 400, node_properties=NODE_PROPERTIES))
+    configure(async_widget)
+    with quiet():
+        asyncio.run(async_widget.show_cypher_async(CYPHER))
+    assert items(async_widget) == items(widget)
+
+
+def test_result_cache_hits_and_misses(driver: ReplayDriver) -> None:
+    widget = Neo4jGraphWidget(driver)
+    widget.set_result_cache(max_size=2)
+    show(widget)
+    shown = items(widget)
+    query_count = len(driver.queries)
+    show(widget)
+    assert len(driver.queries) == query_count
+    assert items(widget) == shown
+    show(widget, limit=10)
+    assert widget.get_result_cache_stats() == {'hits': 1, 'misses': 2, 'evictions': 0, 'size': 2}
+    widget.clear_result_cache()
+    show(widget)
+    assert widget.get_result_cache_stats()['misses'] == 3
+
+
+def test_element_budget_rejects_oversize_results(driver: ReplayDriver) -> None:
+    widget = Neo4jGraphWidget(driver)
+    widget.set_element_budget(100)
+    with pytest.raises(Exception, match="element budget"):
+        show(widget)
+    widget.set_element_budget(1000)
+    show(widget)
+    assert len(widget._widget.nodes) + len(widget._widget.edges) == 600
+
+
+@pytest.mark.parametrize("max_elements", [1, 3, 100, 599])
+def test_streaming_stays_within_max_elements(driver: ReplayDriver, max_elements: int) -> None:
+    widget = Neo4jGraphWidget(driver)
+    with quiet():
+        widget.show_cypher_streaming(CYPHER, batch_size=50, max_elements=max_elements)
+    assert len(widget._widget.nodes) + len(widget._widget.edges) <= max_elements
+
+
+def test_streaming_equals_show_cypher(driver: ReplayDriver) -> None:
+    widget = Neo4jGraphWidget(driver)
+    configure(widget)
+    show(widget)
+    streamed = Neo4jGraphWidget(driver)
+    configure(streamed)
+    with quiet():
+        streamed.show_cypher_streaming(CYPHER, batch_size=50)
+    assert items(streamed) == items(widget)
+
+
+def test_add_cypher_merges_like_a_single_query(driver: ReplayDriver) -> None:
+    widget = Neo4jGraphWidget(driver)
+    configure(widget)
+    show(widget)
+    with driver.session() as session:
+        result = session.run(CYPHER)
+        keys = result.keys()
+        rows = [record.values() for record in result]
+    parts = ReplayDriver(keys, rows[:200])
+    parts.add_response("second", keys, rows[200:400])
+    parts.add_response("third", keys, rows[400:])
+    merged = Neo4jGraphWidget(parts)
+    configure(merged)
+    show(merged, "first")
+    merged.add_cypher("second")
+    merged.add_cypher("third")
+    assert items(merged) == items(widget)
+
+
+def test_snapshot_round_trip(tmp_path: Any) -> None:
+    driver = ReplayDriver.synthetic(50, 100, node_properties={**NODE_PROPERTIES,
+                                                              'raw': lambda rnd, index: bytearray(b'xyz')})
+    widget = Neo4jGraphWidget(driver)
+    widget.set_graph_retention()
+    configure(widget)
+    show(widget, layout='hierarchic')
+    path = str(tmp_path / 'graph.snapshot')
+    widget.save_snapshot(path)
+    restored = Neo4jGraphWidget()
+    with quiet():
+        restored.show_snapshot(path)
+    assert items(restored) == items(widget)
+    assert restored._widget.nodes[0]['properties']['raw'] == b'xyz'
+    assert restored._widget.get_graph_layout()['algorithm'] == 'hierarchic'
+
+
+def test_restyle_only_sends_changed_lists(driver: ReplayDriver) -> None:
+    widget = Neo4jGraphWidget(driver)
+    widget.set_graph_retention()
+    configure(widget)
+    show(widget)
+    widget.restyle()
+    assert widget.get_pipeline_stats()['changed'] == []
+    widget.add_relationship_configuration('KNOWS', color='green')
+    widget.restyle()
+    assert widget.get_pipeline_stats()['changed'] == ['_edges']
+    assert {edge['color'] for edge in widget._widget.edges if edge['properties']['label'] == 'KNOWS'} == {'green'}
+
+
+def test_shown_graph_is_only_retained_on_request(driver: ReplayDriver) -> None:
+    widget = Neo4jGraphWidget(driver)
+    show(widget)
+    assert widget._compact_graph is None
+    with pytest.raises(Exception, match="set_graph_retention"):
+        widget.restyle()
+    with pytest.raises(Exception, match="set_graph_retention"):
+        widget.save_snapshot('unused.snapshot')
+    widget.set_graph_retention()
+    show(widget)
+    widget.restyle()
+    assert widget._compact_graph.node_count == 200
+
+
+def test_layout_cache_reuses_positions(driver: ReplayDriver) -> None:
+    widget = Neo4jGraphWidget(driver)
+    widget.set_layout_cache()
+    show(widget)
+    positions = {node['id']: node['position'] for node in widget._widget.nodes}
+    assert widget.get_layout_cache_stats() == {'hits': 0, 'misses': 200, 'evictions': 0, 'size': 200}
+    show(widget)
+    assert {node['id']: node['position'] for node in widget._widget.nodes} == positions
+    assert widget.get_layout_cache_stats()['hits'] == 200
+
+
+def test_saving_onto_a_shown_snapshot_keeps_the_shown_graph(tmp_path: Any) -> None:
+    path = str(tmp_path / 'graph.snapshot')
+    widget = Neo4jGraphWidget(ReplayDriver.synthetic(300, 600, node_properties=NODE_PROPERTIES))
+    widget.set_graph_retention()
+    configure(widget)
+    show(widget)
+    widget.save_snapshot(path)
+    shown = Neo4jGraphWidget()
+    shown.set_graph_retention()
+    with quiet():
+        shown.show_snapshot(path)
+    expected = items(shown)
+    smaller = Neo4jGraphWidget(ReplayDriver.synthetic(10, 10))
+    smaller.set_graph_retention()
+    show(smaller)
+    smaller.save_snapshot(path)
+    shown.restyle()
+    assert items(shown) == expected
+    restored = Neo4jGraphWidget()
+    with quiet():
+        restored.show_snapshot(path)
+    assert len(restored._widget.nodes) == 10
+    assert [name for name in os.listdir(tmp_path)] == ['graph.snapshot']
+
+
+def test_updating_a_shown_graph_requires_the_core_mapper(driver: ReplayDriver) -> None:
+    widget = Neo4jGraphWidget(driver)
+    widget.set_graph_retention()
+    show(widget)
+    del widget._widget._mapper
+    with pytest.raises(Exception, match="not supported by this version of yfiles_jupyter_graphs"):
+        widget.restyle()
+
+
+def test_expand_skips_loaded_parent_relationships(driver: ReplayDriver) -> None:
+    widget = Neo4jGraphWidget(driver)
+    widget.set_graph_retention()
+    configure(widget)
+    show(widget)
+    shown = items(widget)
+    with driver.session() as session:
+        graph = session.run(CYPHER).graph()
+    parent = next(relationship for relationship in graph.relationships if relationship.type == 'ACTED_IN')
+    node_id = parent.start_node.id
+    relationships = [relationship for relationship in graph.relationships
+                     if node_id in (relationship.start_node.id, relationship.end_node.id)]
+    other_nodes = [relationship.end_node if relationship.start_node.id == node_id else relationship.start_node
+                   for relationship in relationships]
+    # the database would exclude the loaded relationships, the recorded response repeats them
+    expand_cypher = Neo4jGraphWidget._Neo4jGraphWidget__get_expand_cypher(False, True)
+    driver.add_response(expand_cypher, ['rel', 'm'], [list(row) for row in zip(relationships, other_nodes)])
+    widget.expand([node_id])
+    assert parent.id in driver.parameters[-1]['loaded_relationship_ids']
+    assert set(driver.parameters[-1]['loaded_relationship_ids']) == {relationship.id for relationship in relationships}
+    assert items(widget) == shown
+    widget.add_cypher("MATCH (s)-[r:ACTED_IN]->(t) RETURN s,r,t")
+    assert items(widget) == shown
+    assert widget._compact_graph.relationship_count == len(graph.relationships)
+
+
+@pytest.mark.parametrize("sampling", [None, 'random'])
+def test_autocomplete_fallback_stays_within_the_element_budget(sampling: str) -> None:
+    driver = ReplayDriverWithoutSubqueries.synthetic(200, 400)
+    widget = Neo4jGraphWidget(driver)
+    widget.set_autocomplete_relationships(True)
+    widget.set_element_budget(100, sampling)
+    with pytest.raises(Exception, match="element budget"):
+        show(widget)
+    assert not any('$node_ids' in query for query in driver.queries)
+    widget.set_element_budget(1000)
+    show(widget)
+    assert '$node_ids' in driver.queries[-1]
+    assert len(widget._widget.nodes) == 200
+
+
+def test_async_autocomplete_fallback_stays_within_the_element_budget() -> None:
+    driver = AsyncReplayDriverWithoutSubqueries.synthetic(200, 400)
+    widget = Neo4jGraphWidget(driver)
+    widget.set_autocomplete_relationships(True)
+    widget.set_element_budget(100)
+    with pytest.raises(Exception, match="element budget"), quiet():
+        asyncio.run(widget.show_cypher_async(CYPHER))
+    assert not any('$node_ids' in query for query in driver.queries)
+
+
+def test_autocomplete_wrapping_is_not_retried_once_rejected() -> None:
+    driver = ReplayDriverWithoutSubqueries.synthetic(20, 40)
+    widget = Neo4jGraphWidget(driver)
+    widget.set_autocomplete_relationships(True)
+    show(widget)
+    assert sum(query.startswith('CALL') for query in driver.queries) == 1
+    query_count = len(driver.queries)
+    show(widget)
+    assert len(driver.queries) == query_count + 2
+    assert not any(query.startswith(('CALL', 'EXPLAIN')) for query in driver.queries[query_count:])
+    widget.set_driver(driver)
+    show(widget)
+    assert sum(query.startswith('CALL') for query in driver.queries) == 2
+
+
+def test_async_autocomplete_wrapping_is_not_retried_once_rejected() -> None:
+    driver = AsyncReplayDriverWithoutSubqueries.synthetic(20, 40)
+    widget = Neo4jGraphWidget(driver)
+    widget.set_autocomplete_relationships(True)
+    with quiet():
+        asyncio.run(widget.show_cypher_async(CYPHER))
+        asyncio.run(widget.show_cypher_async(CYPHER))
+    assert sum(query.startswith('CALL') for query in driver.queries) == 1
+    assert sum(query.startswith('EXPLAIN') for query in driver.queries) == 1
+
+
+WIDE_NODE_PROPERTIES = {
+    'Title': lambda rnd, index: f"Node {index}",
+    'score': lambda rnd, index: rnd.random(),
+    'cell': lambda rnd, index: (index % 3, index // 3),
+    'embedding': lambda rnd, index: [rnd.random() for _ in range(16)],
+}
+
+
+@pytest.fixture
+def wide_driver() -> ReplayDriver:
+    return ReplayDriver.synthetic(40, 60, node_properties=WIDE_NODE_PROPERTIES)
+
+
+def property_keys(widget: Neo4jGraphWidget) -> Tuple[Dict[str, set], Dict[str, set]]:
+    """
+    Returns the shown property keys per node label and per relationship type.
+    """
+    node_keys, edge_keys = {}, {}
+    for shown, keys in ((widget._widget.nodes, node_keys), (widget._widget.edges, edge_keys)):
+        for item in shown:
+            properties = dict(item['properties'])
+            keys.setdefault(properties.pop('label'), set()).update(properties)
+    return node_keys, edge_keys
+
+
+def test_property_projection_keeps_referenced_and_label_keys(wide_driver: ReplayDriver) -> None:
+    widget = Neo4jGraphWidget(wide_driver)
+    widget.add_node_configuration('Person', color='score')
+    widget.add_relationship_configuration('KNOWS', thickness_factor='weight')
+    widget.set_property_projection()
+    show(widget)
+    node_keys, edge_keys = property_keys(widget)
+    # the label key is kept regardless of its case, the unused embedding is dropped
+    assert node_keys == {'Person': {'Title', 'score'}, 'Movie': {'Title'}}
+    assert edge_keys == {'KNOWS': {'weight'}, 'ACTED_IN': set()}
+
+    widget.del_property_projection()
+    show(widget)
+    node_keys, edge_keys = property_keys(widget)
+    assert node_keys['Movie'] == set(WIDE_NODE_PROPERTIES)
+    assert edge_keys['ACTED_IN'] == {'weight'}
+
+
+def test_property_projection_keeps_additional_keys(wide_driver: ReplayDriver) -> None:
+    widget = Neo4jGraphWidget(wide_driver)
+    widget.set_property_projection(['score', 'weight'])
+    show(widget)
+    node_keys, edge_keys = property_keys(widget)
+    assert node_keys == {'Person': {'Title', 'score'}, 'Movie': {'Title', 'score'}}
+    assert edge_keys == {'KNOWS': {'weight'}, 'ACTED_IN': {'weight'}}
+
+
+def test_property_projection_keeps_all_properties_for_function_bindings(wide_driver: ReplayDriver) -> None:
+    widget = Neo4jGraphWidget(wide_driver)
+    widget.add_node_configuration('Person', color=lambda node: '#2a9d8f', text='score')
+    widget.set_property_projection()
+    show(widget)
+    node_keys, _ = property_keys(widget)
+    assert node_keys == {'Person': set(WIDE_NODE_PROPERTIES), 'Movie': {'Title'}}
+
+
+def test_property_projection_keeps_the_node_cell_mapping(wide_driver: ReplayDriver) -> None:
+    widget = Neo4jGraphWidget(wide_driver)
+    widget.set_node_cell_mapping('cell')
+    widget.set_property_projection()
+    show(widget)
+    node_keys, edge_keys = property_keys(widget)
+    assert node_keys == {'Person': {'Title', 'cell'}, 'Movie': {'Title', 'cell'}}
+    assert edge_keys == {'KNOWS': set(), 'ACTED_IN': set()}
+
+
+def test_property_projection_falls_back_to_the_wildcard_configuration(wide_driver: ReplayDriver) -> None:
+    widget = Neo4jGraphWidget(wide_driver)
+    widget.add_node_configuration('*', text='score')
+    widget.add_node_configuration('Person', color='#2a9d8f')
+    widget.set_property_projection()
+    show(widget)
+    node_keys, _ = property_keys(widget)
+    # the Person configuration replaces the wildcard configuration, the constant color does not hurt as key
+    assert node_keys == {'Person': {'Title'}, 'Movie': {'Title', 'score'}}
+
+
+@pytest.mark.parametrize("normalizer", [ColumnBinding.min_max, ColumnBinding.log, ColumnBinding.quantile])
+def test_normalizers_scale_to_the_bounds_and_keep_nan(normalizer: Any) -> None:
+    np = pytest.importorskip("numpy")
+    values = normalizer('x', 1, 3).function(np.array([0.0, np.nan, 4.0, 2.0, 9.0]))
+    assert (values[0], values[4]) == (1.0, 3.0)
+    assert 1.0 < values[2] < 3.0 and 1.0 < values[3] < values[2]
+    assert np.isnan(values[1])
+
+
+@pytest.mark.parametrize("normalizer, level", [(ColumnBinding.min_max, 1.0), (ColumnBinding.log, 1.0),
+                                               (ColumnBinding.quantile, 2.0)])
+@pytest.mark.parametrize("column", [[5.0, 5.0, 5.0], [7.0], [float('nan'), 7.0], [float('nan'), float('nan')], []])
+def test_normalizers_map_equal_values_to_one_level(normalizer: Any, level: float, column: List[float]) -> None:
+    # the scaling normalizers use the lower bound without extent, the quantile is the average of equal values
+    np = pytest.importorskip("numpy")
+    values = normalizer('x', 1, 3).function(np.array(column, dtype=float))
+    assert [None if np.isnan(value) else value for value in values] == [
+        None if value != value else level for value in column]
+
+
+def test_quantile_averages_the_ranks_of_equal_values() -> None:
+    np = pytest.importorskip("numpy")
+    values = ColumnBinding.quantile('x').function(np.array([3.0, 1.0, 3.0, 2.0, 4.0]))
+    assert values.tolist() == [0.625, 0.0, 0.625, 0.25, 1.0]
+
+
+def test_log_treats_negative_values_as_zero() -> None:
+    np = pytest.importorskip("numpy")
+    values = ColumnBinding.log('x').function(np.array([-5.0, 0.0, np.e - 1]))
+    assert values.tolist() == [0.0, 0.0, 1.0]
+
+
+def scale_factors(widget: Neo4jGraphWidget) -> Dict[str, Dict[Any, float]]:
+    factors = {}
+    for node in widget._widget.nodes:
+        factors.setdefault(node['properties']['label'], {})[node['id']] = node['scale_factor']
+    return factors
+
+
+def test_column_bindings_are_evaluated_per_label(driver: ReplayDriver) -> None:
+    pytest.importorskip("numpy")
+    widget = Neo4jGraphWidget(driver)
+    widget.add_node_configuration('*', scale_factor=ColumnBinding.min_max('score', 1, 2))
+    widget.add_node_configuration('Person', scale_factor=ColumnBinding.quantile('score', 3, 4))
+    show(widget)
+    factors = scale_factors(widget)
+    assert set(factors) == {'Person', 'Movie'}
+    # the wildcard binding applies to the labels without configuration, each label is normalized separately
+    assert (min(factors['Movie'].values()), max(factors['Movie'].values())) == (1.0, 2.0)
+    assert (min(factors['Person'].values()), max(factors['Person'].values())) == (3.0, 4.0)
+    person_scores = {node['id']: node['properties']['score'] for node in widget._widget.nodes
+                     if node['properties']['label'] == 'Person'}
+    assert sorted(person_scores, key=person_scores.get) == sorted(factors['Person'], key=factors['Person'].get)
+
+
+def test_column_bindings_of_the_wrong_length_are_rejected(driver: ReplayDriver) -> None:
+    pytest.importorskip("numpy")
+    widget = Neo4jGraphWidget(driver)
+    widget.add_node_configuration('Person', scale_factor=ColumnBinding('score', lambda column: column[1:]))
+    with pytest.raises(ValueError, match="'scale_factor' for 'Person'"):
+        show(widget)
+
+
+def test_column_bindings_are_evaluated_for_added_items_by_restyle() -> None:
+    pytest.importorskip("numpy")
+    driver = ReplayDriver.synthetic(10, 0)
+    with ReplayDriver.synthetic(12, 0).session() as session:
+        result = session.run(CYPHER)
+        driver.add_response("MATCH (s) RETURN s,null,null", result.keys(), [record.values() for record in result])
+    widget = Neo4jGraphWidget(driver)
+    widget.set_graph_retention()
+    widget.add_node_configuration('*', scale_factor=ColumnBinding.min_max('score', 2, 3))
+    show(widget)
+    with quiet():
+        widget.add_cypher("MATCH (s) RETURN s,null,null")
+    # the added items use the default binding until the graph is restyled
+    factors = {node['id']: node['scale_factor'] for node in widget._widget.nodes}
+    assert (factors[10], factors[11]) == (1.0, 1.0)
+    with quiet():
+        widget.restyle()
+    factors = {node['id']: node['scale_factor'] for node in widget._widget.nodes}
+    assert len(factors) == 12 and all(2.0 <= factor <= 3.0 for factor in factors.values())
+    assert sorted(factors.values())[::11] == [2.0, 3.0]
+
+
+PEOPLE = "MATCH (s:Person) RETURN s,null,null LIMIT $limit"
+
+
+def add_people(driver: ReplayDriver, count: int) -> None:
+    with ReplayDriver.synthetic(count, 0, labels={'Person': 1}).session() as session:
+        result = session.run(CYPHER)
+        driver.add_response(PEOPLE, result.keys(), [record.values() for record in result])
+
+
+def test_show_cyphers_shows_each_query(driver: ReplayDriver) -> None:
+    add_people(driver, 5)
+    widget = Neo4jGraphWidget(driver)
+    widget.set_result_cache()
+    show(widget)
+    all_stats = []
+    widget.set_pipeline_stats_callback(all_stats.append)
+    query_count = len(driver.queries)
+    with quiet():
+        widget.show_cyphers([CYPHER, (PEOPLE, {'limit': 5})], max_workers=2)
+
+    # the cached query is not run again
+    assert driver.queries[query_count:] == [PEOPLE]
+    assert driver.parameters[query_count:] == [{'limit': 5}]
+    assert [(stats['cypher'], stats['cached']) for stats in all_stats] == [(CYPHER, True), (PEOPLE, False)]
+    assert [stats['nodes'] for stats in all_stats] == [200, 5]
+    assert [stats['relationships'] for stats in all_stats] == [400, 0]
+    assert widget.get_pipeline_stats() is all_stats[-1]
+    # the last graph is the most recently shown one, and its query is cached afterward
+    assert len(widget._widget.nodes) == 5
+    assert widget.get_result_cache_stats()['size'] == 2
+
+
+def test_show_cyphers_propagates_the_errors_of_the_queries() -> None:
+    class FailingDriver(ReplayDriver):
+        def _get_response(self, query: Any, parameters: Dict[str, Any]) -> Any:
+            response = super()._get_response(query, parameters)
+            if self.queries[-1] == PEOPLE:
+                raise RuntimeError("unknown label")
+            return response
+
+    failing_driver = FailingDriver.synthetic(20, 10)
+    add_people(failing_driver, 5)
+    widget = Neo4jGraphWidget(failing_driver)
+    with quiet(), pytest.raises(RuntimeError, match="unknown label"):
+        widget.show_cyphers([CYPHER, (PEOPLE, {'limit': 5}), CYPHER])
+    assert widget._widget is None
+
+
+class ClosingReplayDriver(ReplayDriver):
+    closed = False
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class ClosingAsyncReplayDriver(AsyncReplayDriver):
+    closed = False
+
+    async def close(self) -> None:
+        await asyncio.sleep(0)
+        self.closed = True
+
+
+def test_importing_the_package_defers_the_widget_imports() -> None:
+    code = ("import sys, yfiles_jupyter_graphs_for_neo4j, yfiles_jupyter_graphs_for_neo4j.replay; "
+            "print(sorted(module for module in ('ipywidgets', 'IPython', 'yfiles_jupyter_graphs') "
+            "if module in sys.modules))")
+    # a fresh interpreter, since the other tests already imported the widget
+    output = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True,
+                            env={**os.environ, 'PYTHONPATH': os.pathsep.join(sys.path)}).stdout
+    assert output.strip() == "[]"
+
+
+def test_context_manager_closes_the_driver() -> None:
+    driver = ClosingReplayDriver.synthetic(20, 10)
+    with Neo4jGraphWidget(driver) as widget:
+        widget.set_result_cache()
+        widget.set_graph_retention()
+        show(widget)
+        assert not driver.closed
+    assert driver.closed
+    assert widget.get_result_cache_stats()['size'] == 0
+    # the shown widget stays visible, but the loaded elements are released
+    assert len(widget._widget.nodes) == 20
+    with pytest.raises(Exception, match="no graph shown|not retained"):
+        widget.restyle()
+    with pytest.raises(Exception, match="no driver specified"):
+        show(widget)
+
+
+def test_close_rejects_async_drivers() -> None:
+    driver = ClosingAsyncReplayDriver.synthetic(20, 10)
+    widget = Neo4jGraphWidget(driver)
+    with pytest.raises(Exception, match="aclose"):
+        widget.close()
+    assert not driver.closed
+
+
+def test_aclose_awaits_the_closing_of_the_driver() -> None:
+    driver = ClosingAsyncReplayDriver.synthetic(20, 10)
+
+    async def show_and_close() -> Neo4jGraphWidget:
+        async with Neo4jGraphWidget(driver) as widget:
+            with quiet():
+                await widget.show_cypher_async(CYPHER)
+        return widget
+
+    widget = asyncio.run(show_and_close())
+    assert driver.closed
+    assert len(widget._widget.nodes) == 20
+    with pytest.raises(Exception, match="no driver specified"):
+        asyncio.run(widget.show_cypher_async(CYPHER))
+
+
+def test_aclose_closes_sync_drivers() -> None:
+    driver = ClosingReplayDriver.synthetic(20, 10)
+    asyncio.run(Neo4jGraphWidget(driver).aclose())
+    assert driver.closed
+
+
+def test_session_configuration_is_passed_to_the_driver(driver: ReplayDriver) -> None:
+    bookmarks = Bookmarks()
+    widget = Neo4jGraphWidget(driver, autocomplete_relationships=True)
+    widget.set_session_configuration(database='movies', fetch_size=100, read_only=True, transaction_timeout=2.5,
+                                     bookmarks=bookmarks)
+    show(widget)
+    configuration = {'database': 'movies', 'fetch_size': 100, 'default_access_mode': 'READ', 'bookmarks': bookmarks}
+    assert driver.sessions == [configuration]
+    assert widget.get_session_configuration() == {**configuration, 'transaction_timeout': 2.5}
+    # the EXPLAIN queries of the autocompletion are not limited, the executed queries are
+    timeouts = {query.startswith('EXPLAIN'): timeout for query, timeout in zip(driver.queries, driver.timeouts)}
+    assert timeouts == {True: None, False: 2.5}
+
+    query_count = len(driver.queries)
+    widget.set_session_configuration()
+    show(widget)
+    assert driver.sessions[1:] == [{}]
+    assert driver.timeouts[query_count:] == [None] * (len(driver.queries) - query_count)
+
+
+def test_session_configuration_is_passed_to_the_async_driver() -> None:
+    driver = AsyncReplayDriver.synthetic(20, 10)
+    widget = Neo4jGraphWidget(driver)
+    widget.set_session_configuration(database='movies', transaction_timeout=2.5)
+    with quiet():
+        asyncio.run(widget.show_cypher_async(CYPHER))
+    assert driver.sessions == [{'database': 'movies'}]
+    assert driver.queries == [CYPHER] and driver.timeouts == [2.5]